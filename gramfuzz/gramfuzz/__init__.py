@@ -12,11 +12,13 @@ from collections import deque
 import copy
 import gc
 import os
+import pickle
 import sys
 
 
 import gramfuzz.errors as errors
 import gramfuzz.rand as rand
+import gramfuzz.tree as tree
 import gramfuzz.utils as utils
 
 
@@ -63,6 +65,11 @@ class GramFuzzer(object):
     from certain grammar files
     """
 
+    min_size_retries = 1000
+    """The number of generated rules in a row that can be thrown away for being shorter
+    than the ``min_size`` of :any:`gramfuzz.GramFuzzer.gen` before giving up
+    """
+
     __instance__ = None
     @classmethod
     def instance(cls):
@@ -92,8 +99,16 @@ class GramFuzzer(object):
         # the last-defined rule definition names derived from the ``_last_prefs``
         self._last_pref_keys = None
 
+        # the alias table of ``_last_pref_keys`` if ``_last_prefs`` had weights
+        self._last_pref_table = None
+
         # a simple flag to tell if data needs to be auto processed or not
         self._rules_processed = False
+
+        # precomputed rule definition names and weight tables by category,
+        # rebuilt lazily after the definitions of a category change
+        self._cat_keys = {}
+        self._weight_tables = {}
     
     def load_grammar(self, path):
         """Load a grammar file (python file containing grammar definitions) by
@@ -130,6 +145,54 @@ class GramFuzzer(object):
             cat_group = os.path.basename(path).replace(".py", "")
             self.set_cat_group_top_level_cat(cat_group, locals_["TOP_CAT"])
 
+    def save_image(self, path):
+        """Save the rule definitions of this ``GramFuzzer`` (including any preprocessing
+        that has been done) to a grammar image file, which can be loaded with
+        :any:`gramfuzz.GramFuzzer.load_image`. This is much faster than loading
+        the grammar files again, e.g. in each worker process.
+
+        :param str path: The path of the grammar image file
+        """
+        import gramfuzz.fields
+        image = {
+            "version": __version__,
+            "defs": self.defs,
+            "no_prunes": self.no_prunes,
+            "cat_groups": self.cat_groups,
+            "cat_group_defaults": self.cat_group_defaults,
+            "rules_processed": self._rules_processed,
+            "max_recursion": gramfuzz.fields.Ref.max_recursion,
+        }
+        with open(path, "wb") as f:
+            pickle.dump(image, f, pickle.HIGHEST_PROTOCOL)
+
+    def load_image(self, path):
+        """Replace the rule definitions of this ``GramFuzzer`` with the ones saved in the
+        grammar image file at ``path`` (see :any:`gramfuzz.GramFuzzer.save_image`). The image
+        is a pickle cache of the processed rules, each process unpickles its own copy, which is
+        still much faster than loading and preprocessing the grammar files again.
+
+        :param str path: The path of the grammar image file
+        """
+        with open(path, "rb") as f:
+            image = pickle.load(f)
+
+        if image.get("version", None) != __version__:
+            raise errors.GramFuzzError("grammar image {!r} was saved by another gramfuzz version".format(path))
+
+        GramFuzzer.__instance__ = self
+        self.defs = image["defs"]
+        self.no_prunes = image["no_prunes"]
+        self.cat_groups = image["cat_groups"]
+        self.cat_group_defaults = image["cat_group_defaults"]
+        self._rules_processed = image["rules_processed"]
+        self._cat_keys = {}
+        self._weight_tables = {}
+        self._last_prefs = None
+        self._last_pref_keys = None
+        self._last_pref_table = None
+        self.set_max_recursion(image["max_recursion"])
+
     def set_max_recursion(self, level):
         """Set the maximum reference-recursion depth (not the Python system maximum stack
         recursion level). This controls how many levels deep of nested references are allowed
@@ -147,6 +210,9 @@ class GramFuzzer(object):
         to_prune = self._find_shortest_paths()
         self._prune_rules(to_prune)
 
+        for cat in self.defs.keys():
+            self._get_weight_tables(cat)
+
         self._rules_processed = True
 
     def _find_shortest_paths(self):
@@ -207,6 +273,7 @@ class GramFuzzer(object):
             rule_list.remove(rule)
             if len(rule_list) == 0:
                 del self.defs.get(cat, {})[rule.name]
+                self._changed_cat(cat)
 
     def _assign_or_shortest_vals(self, fields, rule_ref_lengths):
         for cat,field in fields:
@@ -324,6 +391,7 @@ class GramFuzzer(object):
         :param str gram_file: The file the rule was defined in (default=``"default"``).
         """
         self._rules_processed = False
+        self._changed_cat(cat)
 
         self.add_to_cat_group(cat, gram_file, def_name)
 
@@ -356,6 +424,81 @@ class GramFuzzer(object):
         :param str def_name: The name of the rule definition
         """
         self.cat_groups.setdefault(cat, {}).setdefault(cat_group, deque()).append(def_name)
+
+    def get_cat_keys(self, cat):
+        """Return the list of rule definition names in the category ``cat``. The
+        list is computed once and reused until the category's definitions change.
+
+        :param str cat: The category to return the rule definition names of
+        :returns: list
+        """
+        keys = self._cat_keys.get(cat, None)
+        if keys is None:
+            keys = self._cat_keys[cat] = list(self.defs[cat].keys())
+        return keys
+
+    def choose_rule_name(self, cat):
+        """Return a rule definition name chosen at random from the category ``cat``,
+        taking the weights of its rule definitions into account.
+
+        :param str cat: The category to choose the rule definition name from
+        :returns: str
+        """
+        cat_table,_ = self._get_weight_tables(cat)
+        if cat_table is None:
+            return rand.choice(self.get_cat_keys(cat))
+        return self.get_cat_keys(cat)[rand.alias_choice(cat_table)]
+
+    def choose_rule(self, cat, def_name):
+        """Return one of the rule definitions named ``def_name`` in the category ``cat``,
+        chosen at random in proportion to their weights.
+
+        :param str cat: The category of the rule definition
+        :param str def_name: The name of the rule definition
+        :returns: gramfuzz.fields.Def
+        """
+        return self.defs[cat][def_name][self.choose_rule_index(cat, def_name)]
+
+    def choose_rule_index(self, cat, def_name):
+        """Same as :any:`gramfuzz.GramFuzzer.choose_rule`, but return the index of the
+        chosen rule definition among the definitions named ``def_name``.
+
+        :param str cat: The category of the rule definition
+        :param str def_name: The name of the rule definition
+        :returns: int
+        """
+        _,def_tables = self._get_weight_tables(cat)
+        def_table = def_tables.get(def_name, None)
+        if def_table is None:
+            return rand.choice(range(len(self.defs[cat][def_name])))
+        return rand.alias_choice(def_table)
+
+    def _get_weight_tables(self, cat):
+        # only weighted categories and rule names get an alias table, everything
+        # else keeps using plain uniform choices
+        tables = self._weight_tables.get(cat, None)
+        if tables is not None:
+            return tables
+
+        cat_defs = self.defs[cat]
+        def_tables = {}
+        name_weights = []
+        for def_name in self.get_cat_keys(cat):
+            weights = [getattr(rule, "weight", 1.0) for rule in cat_defs[def_name]]
+            name_weights.append(sum(weights) / float(len(weights)))
+            if any(weight != 1.0 for weight in weights):
+                def_tables[def_name] = rand.alias(weights)
+
+        cat_table = None
+        if len(def_tables) > 0:
+            cat_table = rand.alias(name_weights)
+
+        tables = self._weight_tables[cat] = (cat_table, def_tables)
+        return tables
+
+    def _changed_cat(self, cat):
+        self._cat_keys.pop(cat, None)
+        self._weight_tables.pop(cat, None)
     
     def get_ref(self, cat, refname):
         """Return one of the rules in the category ``cat`` with the name
@@ -367,19 +510,32 @@ class GramFuzzer(object):
             ``"*"``, then a rule name will be chosen at random from within the category ``cat``.
         :returns: gramfuzz.fields.Def
         """
+        refname,idx = self.get_ref_index(cat, refname)
+        return self.defs[cat][refname][idx]
+
+    def get_ref_index(self, cat, refname):
+        """Same as :any:`gramfuzz.GramFuzzer.get_ref`, but return the name of the rule
+        definition (useful when ``refname`` is ``"*"``) and the index of the chosen
+        rule definition.
+
+        :param str cat: The category to look for the rule in.
+        :param str refname: The name of the rule definition
+        :returns: tuple
+        """
         if cat not in self.defs:
             raise errors.GramFuzzError("referenced definition category ({!r}) not defined".format(cat))
         
         if refname == "*":
-            refname = rand.choice(self.defs[cat].keys())
+            refname = self.choose_rule_name(cat)
             
         if refname not in self.defs[cat]:
             raise errors.GramFuzzError("referenced definition ({!r}) not defined".format(refname))
 
-        return rand.choice(self.defs[cat][refname])
+        return (refname, self.choose_rule_index(cat, refname))
 
 
-    def gen(self, num, cat=None, cat_group=None, preferred=None, preferred_ratio=0.5, max_recursion=None, auto_process=True):
+    def gen(self, num, cat=None, cat_group=None, preferred=None, preferred_ratio=0.5, max_recursion=None, auto_process=True,
+            derivations=None, max_size=None, max_nodes=None, min_size=None):
         """Generate ``num`` rules from category ``cat``, optionally specifying
         preferred category groups ``preferred`` that should be preferred at
         probability ``preferred_ratio`` over other randomly-chosen rule definitions.
@@ -390,107 +546,201 @@ class GramFuzzer(object):
             was added specifically to make it easier to generate data based on the name
             of the file the grammar was defined in, and is intended to work with the
             ``TOP_CAT`` values that may be defined in a loaded grammar file.
-        :param list preferred: A list of preferred category groups to generate rules from
+        :param list preferred: A list of preferred category groups to generate rules from. This
+            may also be a dict of category group names to relative weights, e.g.
+            ``{"group1": 3, "group2": 1}``. A group is chosen according to its weight
+            whatever the number of rules it holds.
         :param float preferred_ratio: The percent probability that the preferred
             groups will be chosen over randomly choosen rule definitions from category ``cat``.
         :param int max_recursion: The maximum amount to allow references to recurse
         :param bool auto_process: Whether rules should be automatically pruned and
             shortest reference paths determined. See :any:`gramfuzz.GramFuzzer.preprocess_rules`
             for what would automatically be done.
+        :param list derivations: If set, the :any:`gramfuzz.tree.Derivation` of each generated
+            rule is appended to this list (prerequisites in the result are not recorded).
+            See :any:`gramfuzz.GramFuzzer.mutate`.
+        :param int max_size: The size budget (in characters) of each generated rule. Once
+            it runs out, only the shortest (reference-wise) versions of the remaining references
+            are built, so the result may still be somewhat larger than ``max_size``.
+        :param int max_nodes: The budget of references built for each generated rule, handled
+            the same way as ``max_size``
+        :param int min_size: Generated rules shorter than this are thrown away and generated again
         """
         import gramfuzz.fields
         gramfuzz.fields.REF_LEVEL = 1
+        gramfuzz.fields.MAX_SIZE = max_size
+        gramfuzz.fields.MAX_NODES = max_nodes
+
+        # the budgets must not leak into Ref.build calls made outside of gen(), even if
+        # an error escapes
+        try:
+            if cat is None and cat_group is None:
+                raise gramfuzz.errors.GramFuzzError("cat and cat_group are None, one must be set")
+
+            if cat is None and cat_group is not None:
+                if cat_group not in self.cat_group_defaults:
+                    raise gramfuzz.errors.GramFuzzError(
+                        "cat_group {!r} did not define a TOP_CAT variable"
+                    )
+                cat = self.cat_group_defaults[cat_group]
+                if not isinstance(cat, basestring):
+                    raise gramfuzz.errors.GramFuzzError(
+                        "cat_group {!r}'s TOP_CAT variable was not a string"
+                    )
+
+            if auto_process and self._rules_processed == False:
+                self.preprocess_rules()
+
+            if max_recursion is not None:
+                self.set_max_recursion(max_recursion)
+
+            if preferred is None:
+                preferred = []
+
+            res = deque()
+            cat_defs = self.defs[cat]
+
+            # optimizations
+            _res_append = res.append
+            _res_extend = res.extend
+            _choice = rand.choice
+            _maybe = rand.maybe
+            _val = utils.val
+            _alias_choice = rand.alias_choice
+            _choose_rule_name = self.choose_rule_name
+            _choose_rule_index = self.choose_rule_index
+
+            self._last_pref_keys = self._get_pref_keys(cat, preferred)
+            # be sure to set this *after* fetching the pref keys (above^)
+            self._last_prefs = preferred
+
+            total_errors = deque()
+            total_gend = 0
+            total_rejected = 0
+            while total_gend < num:
+                # use a rule definition from one of the preferred category
+                # groups
+                if len(self._last_pref_keys) > 0 and _maybe(preferred_ratio):
+                    if self._last_pref_table is not None:
+                        rand_key = self._last_pref_keys[_alias_choice(self._last_pref_table)]
+                    else:
+                        rand_key = _choice(self._last_pref_keys)
+                    if rand_key not in cat_defs:
+                        # TODO this means it was removed / pruned b/c it was unreachable??
+                        # TODO look into this more
+                        rand_key = _choose_rule_name(cat)
 
-        if cat is None and cat_group is None:
-            raise gramfuzz.errors.GramFuzzError("cat and cat_group are None, one must be set")
-
-        if cat is None and cat_group is not None:
-            if cat_group not in self.cat_group_defaults:
-                raise gramfuzz.errors.GramFuzzError(
-                    "cat_group {!r} did not define a TOP_CAT variable"
-                )
-            cat = self.cat_group_defaults[cat_group]
-            if not isinstance(cat, basestring):
-                raise gramfuzz.errors.GramFuzzError(
-                    "cat_group {!r}'s TOP_CAT variable was not a string"
-                )
-
-        if auto_process and self._rules_processed == False:
-            self.preprocess_rules()
-
-        if max_recursion is not None:
-            self.set_max_recursion(max_recursion)
-
-        if preferred is None:
-            preferred = []
-
-        res = deque()
-        cat_defs = self.defs[cat]
+                # else just choose a key at random from the category
+                else:
+                    rand_key = _choose_rule_name(cat)
 
-        # optimizations
-        _res_append = res.append
-        _res_extend = res.extend
-        _choice = rand.choice
-        _maybe = rand.maybe
-        _val = utils.val
-
-        keys = self.defs[cat].keys()
-
-        self._last_pref_keys = self._get_pref_keys(cat, preferred)
-        # be sure to set this *after* fetching the pref keys (above^)
-        self._last_prefs = preferred
-
-        total_errors = deque()
-        total_gend = 0
-        while total_gend < num:
-            # use a rule definition from one of the preferred category
-            # groups
-            if len(self._last_pref_keys) > 0 and _maybe(preferred_ratio):
-                rand_key = _choice(self._last_pref_keys)
+                # pruning failed, this rule is not defined/reachable
                 if rand_key not in cat_defs:
-                    # TODO this means it was removed / pruned b/c it was unreachable??
-                    # TODO look into this more
-                    rand_key = _choice(list(keys))
+                    continue
 
-            # else just choose a key at random from the category
-            else:
-                rand_key = _choice(list(keys))
+                alt = _choose_rule_index(cat, rand_key)
+                v = cat_defs[rand_key][alt]
+
+                # not used directly by GramFuzzer, but could be useful
+                # to subclasses of GramFuzzer
+                info = {}
+
+                pre = deque()
+                self.pre_revert(info)
+                val_res = None
+
+                if derivations is not None:
+                    derivation = gramfuzz.fields.RECORDER = tree.Derivation()
+                    node = derivation.open(cat, rand_key, alt)
+
+                gramfuzz.fields.SIZE = 0
+                gramfuzz.fields.NODES = 0
+
+                try:
+                    val_res = _val(v, pre)
+                except errors.GramFuzzError as e:
+                    raise
+                    #total_errors.append(e)
+                    #self.revert(info)
+                    #continue
+                except RuntimeError as e:
+                    print("RUNTIME ERROR")
+                    self.revert(info)
+                    continue
+                finally:
+                    gramfuzz.fields.RECORDER = None
+
+                if val_res is not None and min_size is not None and len(val_res) < min_size:
+                    self.revert(info)
+                    total_rejected += 1
+                    if total_rejected >= self.min_size_retries:
+                        raise errors.GramFuzzError("could not generate a rule of at least {} characters from {!r}".format(
+                            min_size,
+                            cat,
+                        ))
+                    continue
 
-            # pruning failed, this rule is not defined/reachable
-            if rand_key not in cat_defs:
-                continue
+                if val_res is not None:
+                    total_rejected = 0
+                    if derivations is not None:
+                        derivation.close(node, val_res)
+                        derivation.finish(val_res)
+                        derivations.append(derivation)
 
-            v = _choice(cat_defs[rand_key])
-
-            # not used directly by GramFuzzer, but could be useful
-            # to subclasses of GramFuzzer
-            info = {}
-
-            pre = deque()
-            self.pre_revert(info)
-            val_res = None
-
-            try:
-                val_res = _val(v, pre)
-            except errors.GramFuzzError as e:
-                raise
-                #total_errors.append(e)
-                #self.revert(info)
-                #continue
-            except RuntimeError as e:
-                print("RUNTIME ERROR")
-                self.revert(info)
-                continue
+                    _res_extend(pre)
+                    _res_append(val_res)
 
-            if val_res is not None:
-                _res_extend(pre)
-                _res_append(val_res)
+                    total_gend += 1
+                    self.post_revert(cat, res, total_gend, num, info)
 
-                total_gend += 1
-                self.post_revert(cat, res, total_gend, num, info)
+            return res
+        finally:
+            gramfuzz.fields.MAX_SIZE = None
+            gramfuzz.fields.MAX_NODES = None
+    
+    def mutate(self, derivation, node=None, max_size=None):
+        """Mutate a value generated by :any:`gramfuzz.GramFuzzer.gen` by regenerating
+        the subtree rooted at one of the nodes of its derivation, and splicing the new text
+        into the old value. Only the chosen subtree is built again.
+
+        :param gramfuzz.tree.Derivation derivation: The derivation of the value to mutate (is not modified)
+        :param int node: The index of the node to regenerate (default=``None``, a random
+            node other than the root is chosen if there is one)
+        :param int max_size: The size budget of the whole mutated value, see :any:`gramfuzz.GramFuzzer.gen`
+        :returns: gramfuzz.tree.Derivation, with the mutated value in its ``text``
+        """
+        import gramfuzz.fields
 
+        if node is None:
+            node = 0
+            if len(derivation) > 1:
+                node = rand.randint(1, len(derivation))
+
+        cat,def_name = derivation.rule_name(node)
+        # the regenerated subtree gets whatever is left of the budget once the
+        # rest of the value is accounted for
+        if max_size is not None:
+            start,end = derivation.span(node)
+            max_size = max(0, max_size - (len(derivation.text) - (end - start)))
+        gramfuzz.fields.MAX_SIZE = max_size
+        gramfuzz.fields.MAX_NODES = None
+        gramfuzz.fields.SIZE = 0
+        gramfuzz.fields.NODES = 0
+        sub = gramfuzz.fields.RECORDER = tree.Derivation()
+        # keep the recursion limit in effect as if the subtree was being built
+        # in place
+        gramfuzz.fields.REF_LEVEL = derivation.depth(node)
+        try:
+            text = gramfuzz.fields.Ref(def_name, cat=cat).build(deque())
+        finally:
+            gramfuzz.fields.RECORDER = None
+            gramfuzz.fields.MAX_SIZE = None
+        sub.finish(text)
+
+        res = derivation.copy()
+        res.splice(node, sub)
         return res
-    
+
     def pre_revert(self, info=None):
         """Signal to begin saving any changes that might need to be reverted
         """
@@ -504,6 +754,7 @@ class GramFuzzer(object):
             return
         for cat,def_name,def_value in self._staged_defs:
             self.defs.setdefault(cat, {}).setdefault(def_name, deque()).append(def_value)
+            self._changed_cat(cat)
         self._staged_defs = None
     
     def revert(self, info=None):
@@ -516,11 +767,24 @@ class GramFuzzer(object):
         if preferred == self._last_prefs:
             pref_keys = self._last_pref_keys
         else:
-            pref_keys = deque()
+            pref_keys = []
+            pref_weights = []
             for pref in preferred:
                 if pref in self.cat_groups[cat]:
-                    pref_keys.extend(self.cat_groups[cat][pref])
+                    group_keys = self.cat_groups[cat][pref]
                 elif pref in self.defs[cat]:
-                    pref_keys.append(pref)
+                    group_keys = [pref]
+                else:
+                    continue
+                if len(group_keys) == 0:
+                    continue
+                pref_keys.extend(group_keys)
+                if isinstance(preferred, dict):
+                    # the weight belongs to the group, not to each of its rules
+                    pref_weights.extend([preferred[pref] / float(len(group_keys))] * len(group_keys))
+
+            self._last_pref_table = None
+            if len(pref_weights) > 0:
+                self._last_pref_table = rand.alias(pref_weights)
 
         return pref_keys
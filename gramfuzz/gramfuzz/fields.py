@@ -25,6 +25,12 @@ from collections import deque
 import json
 import inspect
 import os
+import sys
+
+try:
+    import copyreg
+except ImportError:
+    import copy_reg as copyreg
 
 
 from gramfuzz import GramFuzzer
@@ -33,6 +39,38 @@ import gramfuzz.rand as rand
 import gramfuzz.utils as utils
 
 
+RECORDER = None
+"""The :any:`gramfuzz.tree.Derivation` that rules being built are recorded into, if any
+"""
+
+
+def _record_values(values, sep, pre, shortest):
+    """Build and join ``values`` like ``And`` and ``Join`` do, while placing
+    the derivation nodes of each value in the joined result.
+    """
+    recorder = RECORDER
+    pieces = []
+    marks = []
+    for value in values:
+        mark = recorder.mark()
+        try:
+            v = utils.val(value, pre, shortest=shortest)
+        except errors.OptGram as e:
+            recorder.drop(mark)
+            continue
+        if v is utils.SKIP:
+            recorder.drop(mark)
+            continue
+        pieces.append(v)
+        marks.append(mark)
+
+    recorder.place(marks, pieces, sep)
+    return sep.join(pieces)
+
+
+# the type of the descriptors created by ``__slots__``
+_SlotDescriptor = type(type("_Slotted", (object,), {"__slots__": ("slot",)}).__dict__["slot"])
+
 class MetaField(type):
     """Used as the metaclass of the core :any:`gramfuzz.fields.Field` class. ``MetaField``
     defines ``__and__`` and ``__or__`` and ``__repr__`` methods.
@@ -68,8 +106,57 @@ class MetaField(type):
 
             (Int | Float) | Uint
             Int | Float | UInt
+
+    ``MetaField`` also keeps fields compact. Instance attributes are stored in
+    ``__slots__`` instead of an instance dict, and class-level values of slotted
+    attributes (e.g. ``sep = ","``) are moved into the class's ``_defaults`` dict,
+    which every new instance is initialized from. Subclasses that only set defaults
+    should declare ``__slots__ = ()`` to stay compact as well.
     """
 
+    def __new__(mcs, name, bases, attrs):
+        slot_names = set()
+        defaults = {}
+        for base in reversed(bases):
+            slot_names.update(getattr(base, "_slot_names", ()))
+            defaults.update(getattr(base, "_defaults", {}))
+
+        own_slots = attrs.get("__slots__", ())
+        if isinstance(own_slots, str):
+            own_slots = (own_slots,)
+        slot_names.update(own_slots)
+
+        # a class attribute with the same name as a slot would replace the
+        # slot's descriptor
+        for key in list(attrs.keys()):
+            if key in slot_names:
+                defaults[key] = attrs.pop(key)
+
+        attrs["_slot_names"] = frozenset(slot_names)
+        attrs["_defaults"] = defaults
+        return super(MetaField, mcs).__new__(mcs, name, bases, attrs)
+
+    def __getattribute__(cls, name):
+        """Class-level reads of a slotted attribute (e.g. ``Int.min``) return its default
+        value instead of the slot's descriptor
+        """
+        res = type.__getattribute__(cls, name)
+        if type(res) is _SlotDescriptor:
+            defaults = type.__getattribute__(cls, "_defaults")
+            if name in defaults:
+                return defaults[name]
+        return res
+
+    def __setattr__(cls, name, value):
+        """Class-level writes of a slotted attribute (e.g. ``Int.min = 0``) change the default
+        value of the new instances of the class (subclasses that already exist keep their own
+        defaults)
+        """
+        if name in type.__getattribute__(cls, "_slot_names"):
+            type.__getattribute__(cls, "_defaults")[name] = value
+        else:
+            type.__setattr__(cls, name, value)
+
     def __and__(self, other):
         """Wraps this field and the other field in an ``And``
         """
@@ -91,12 +178,15 @@ class MetaField(type):
     def __repr__(self):
         return "<{}>".format(self.__name__)
 
-class Field(object):
+# works with both the python 2 and python 3 metaclass syntax
+_FieldBase = MetaField("_FieldBase", (object,), {"__slots__": ()})
+
+class Field(_FieldBase):
     """The core class that all field classes are based one. Contains
     utility methods to determine probabilities/choices/min-max/etc.
     """
 
-    __metaclass__ = MetaField
+    __slots__ = ("min", "max", "odds", "_odds_table")
 
     shortest_is_nothing = False
     """This is used during :any:`gramfuzz.GramFuzzer.find_shortest_paths`. Sometimes
@@ -108,8 +198,9 @@ class Field(object):
 
     *NOTE* when implementing a custom Field subclass and setting ``shortest_is_nothing``
     to ``True``, be sure to handle the case when ``build(shortest=True)``
-    is called so that a ``gramfuzz.errors.OptGram`` error is raised (which
-    skips the current field from being generated).
+    is called so that :any:`gramfuzz.utils.SKIP` is returned (which
+    skips the current field from being generated). Raising a ``gramfuzz.errors.OptGram``
+    error is still supported, but is much slower.
     """
 
     min = 0
@@ -133,6 +224,51 @@ class Field(object):
     Note that the sum of each probability percent in the list must equal 1.0.
     """
 
+    _odds_table = None
+
+    def __new__(cls, *args, **kwargs):
+        self = super(Field, cls).__new__(cls)
+        for name,value in cls._defaults.items():
+            setattr(self, name, value)
+        return self
+
+    @property
+    def fuzzer(self):
+        """The current :any:`gramfuzz.GramFuzzer` instance
+        """
+        return GramFuzzer.instance()
+
+    def __reduce_ex__(self, protocol):
+        """Pickle slotted fields. Fields whose class can't be imported by name (e.g. classes
+        declared in a grammar file loaded with :any:`gramfuzz.GramFuzzer.load_grammar`) are
+        pickled as their nearest importable base class, as long as the class itself only
+        sets default values.
+        """
+        cls = self.__class__
+        while not _importable(cls):
+            extra = set(cls.__dict__.keys()) - _PLAIN_CLASS_ATTRS
+            if len(extra) > 0 or len(getattr(self, "__dict__", {})) > 0:
+                raise errors.GramFuzzError("cannot pickle {!r}, its class is not importable".format(self))
+            cls = cls.__bases__[0]
+
+        # values that are still the class defaults are filled in by __new__ when unpickling
+        defaults = cls._defaults
+        state = {}
+        for name in self._slot_names:
+            if not hasattr(self, name):
+                continue
+            value = getattr(self, name)
+            if name not in defaults or defaults[name] is not value:
+                state[name] = value
+        state.update(getattr(self, "__dict__", {}))
+        if cls is self.__class__:
+            return (copyreg.__newobj__, (cls,), state)
+        return (_new_field, (cls,), state)
+
+    def __setstate__(self, state):
+        for name,value in state.items():
+            setattr(self, name, value)
+
     def __and__(self, other):
         """Wrap this field and the other field in an ``And``
 
@@ -170,13 +306,16 @@ class Field(object):
         if len(self.odds) == 0:
             self.odds = [(1.00, [self.min, self.max])]
 
-        rand_val = rand.random()
-        total = 0
-        for percent,v in self.odds:
-            if total <= rand_val < total+percent:
-                found_v = v
-                break
-            total += percent
+        # the cumulative probability table is cached until the odds list
+        # is replaced
+        table = self._odds_table
+        if table is None or table[0] is not self.odds:
+            table = self._odds_table = (
+                self.odds,
+                rand.cumulative(percent for percent,v in self.odds),
+            )
+
+        percent,v = self.odds[rand.pick(table[1])]
 
         res = None
         if isinstance(v, (tuple,list)):
@@ -205,6 +344,8 @@ class Int(Field):
     boundary conditions.
     """
 
+    __slots__ = ("value",)
+
     min = 0
     max = 0x10000003
     neg = True
@@ -261,12 +402,16 @@ class Int(Field):
 class UInt(Int):
     """Defines an unsigned integer ``Field``.
     """
+
+    __slots__ = ()
     neg = False
 
 class Float(Int):
     """Defines a float ``Field`` with odds that define float
     values
     """
+
+    __slots__ = ()
     odds = [
         (0.75,    [0.0,100.0]),
         (0.05,    0),
@@ -278,11 +423,15 @@ class Float(Int):
 class UFloat(Float):
     """Defines an unsigned float field.
     """
+
+    __slots__ = ()
     neg = False
 
 class String(UInt):
     """Defines a string field
     """
+
+    __slots__ = ("charset",)
     min = 0
     max = 0x100
 
@@ -363,6 +512,8 @@ class Join(Field):
     """A ``Field`` subclass that joins other values with a separator.
     This class works nicely with ``Opt`` values.
     """
+
+    __slots__ = ("values", "sep")
     
     sep = ","
 
@@ -401,13 +552,19 @@ class Join(Field):
         else:
             vals = self.values
 
+        if RECORDER is not None:
+            return _record_values(vals, self.sep, pre, shortest)
+
         joins = []
+        _val = utils.val
+        _skip = utils.SKIP
         for val in vals:
             try:
-                v = utils.val(val, pre, shortest=shortest)
-                joins.append(v)
+                v = _val(val, pre, shortest=shortest)
             except errors.OptGram as e:
                 continue
+            if v is not _skip:
+                joins.append(v)
         return self.sep.join(joins)
 
 
@@ -416,6 +573,8 @@ class And(Field):
     This class works nicely with ``Opt`` values.
     """
 
+    __slots__ = ("values", "sep", "rolling")
+
     sep = ""
 
     def __init__(self, *values, **kwargs):
@@ -427,7 +586,6 @@ class And(Field):
         self.values = list(values)
         # to be used internally, is not intended to be set directly by a user
         self.rolling = kwargs.setdefault("rolling", False)
-        self.fuzzer = GramFuzzer.instance()
     
     def build(self, pre=None, shortest=False):
         """Build the ``And`` instance
@@ -438,10 +596,17 @@ class And(Field):
         if pre is None:
             pre = []
 
+        if RECORDER is not None:
+            return _record_values(self.values, self.sep, pre, shortest)
+
         res = deque()
+        _val = utils.val
+        _skip = utils.SKIP
         for x in self.values:
             try:
-                res.append(utils.val(x, pre, shortest=shortest))
+                v = _val(x, pre, shortest=shortest)
+                if v is not _skip:
+                    res.append(v)
             except errors.OptGram as e:
                 continue
             except errors.FlushGrams as e:
@@ -464,6 +629,8 @@ class Q(And):
     """A ``Field`` subclass that quotes whatever value is provided.
     """
 
+    __slots__ = ("escape", "html_js_escape", "quote")
+
     escape = False
     """Whether or not the quoted data should be escaped (default=``False``). Uses ``repr(X)``
     """
@@ -494,8 +661,16 @@ class Q(And):
         :param list pre: The prerequisites list
         :param bool shortest: Whether or not the shortest reference-chain (most minimal) version of the field should be generated.
         """
+        mark = RECORDER.mark() if RECORDER is not None else None
         res = super(Q, self).build(pre, shortest=shortest)
 
+        if mark is not None:
+            # escaped text no longer lines up with the recorded nodes
+            if self.escape or self.html_js_escape:
+                RECORDER.drop(mark)
+            else:
+                RECORDER.shift(mark, len(self.quote))
+
         if self.escape:
             return repr(res)
         elif self.html_js_escape:
@@ -509,10 +684,18 @@ class Or(Field):
     at random as the result of a call to the ``build()`` method.
     """
 
+    __slots__ = ("values", "rolling", "shortest_vals", "weights", "_weight_table")
+
     def __init__(self, *values, **kwargs):
         """Create a new ``Or`` instance with the provide values
 
         :param list values: The list of values to choose randomly from
+        :param list weights: The relative weights of each of the values (default=``None``,
+            every value is equally likely). E.g.:
+
+            .. code-block:: python
+
+                Or("a", "b", "c", weights=[8, 1, 1])
         """
         # when building with shortest=True, one of these values will
         # be chosen instead of self.values
@@ -522,6 +705,16 @@ class Or(Field):
         if "options" in kwargs and len(values) == 0:
             self.values = kwargs["options"]
         self.rolling = kwargs.setdefault("rolling", False)
+
+        self.weights = kwargs.setdefault("weights", None)
+        self._weight_table = None
+        if self.weights is not None:
+            if len(self.weights) != len(self.values):
+                raise errors.GramFuzzError("Or has {} values but {} weights".format(
+                    len(self.values),
+                    len(self.weights),
+                ))
+            self._weight_table = rand.alias(self.weights)
     
     def build(self, pre=None, shortest=False):
         """Build the ``Or`` instance
@@ -537,24 +730,27 @@ class Or(Field):
         # chain
         if shortest and self.shortest_vals is not None:
             return utils.val(rand.choice(self.shortest_vals), pre, shortest=shortest)
+        elif self._weight_table is not None:
+            return utils.val(self.values[rand.alias_choice(self._weight_table)], pre, shortest=shortest)
         else:
             return utils.val(rand.choice(self.values), pre, shortest=shortest)
 
 
 class Opt(And):
     """A ``Field`` subclass that randomly chooses to either build the
-    provided values (acts as an ``And`` in that case), or raise an
-    ``errors.OptGram`` exception.
+    provided values (acts as an ``And`` in that case), or return the
+    :any:`gramfuzz.utils.SKIP` sentinel.
 
-    When an ``errors.OptGram`` exception is raised, the current value being built
+    When ``SKIP`` is returned, the current value being built
     is then skipped
     """
 
+    __slots__ = ("prob",)
+
     shortest_is_nothing = True
 
     prob = 0.5
-    """The probability of an ``Opt`` instance raising an ``errors.OptGram``
-    exception
+    """The probability of an ``Opt`` instance returning :any:`gramfuzz.utils.SKIP`
     """
 
     def __init__(self, *values, **kwargs):
@@ -577,7 +773,7 @@ class Opt(And):
             pre = []
 
         if shortest or rand.maybe(self.prob):
-            raise errors.OptGram
+            return utils.SKIP
 
         return super(Opt, self).build(pre, shortest=shortest)
 
@@ -611,6 +807,8 @@ class Def(Field):
     rules.
     """
 
+    __slots__ = ("name", "values", "options", "sep", "cat", "no_prune", "weight")
+
     sep = ""
     """The separator of values for this rule definition (default=``""``)
     """
@@ -624,6 +822,12 @@ class Def(Field):
     """The default category of this ``Def`` class (default=``"default"``)
     """
 
+    weight = 1.0
+    """The relative weight of this rule definition (default=``1.0``). Definitions sharing
+    a name are chosen in proportion to their weights, and a rule name is chosen from its
+    category in proportion to the average weight of its definitions.
+    """
+
     def __init__(self, name, *values, **options):
         """Create a new rule definition. Simply instantiating a new rule definition
         will add it to the current ``GramFuzzer`` instance.
@@ -634,6 +838,7 @@ class Def(Field):
         :param str cat: The category to create the rule in (default=``"default"``).
         :param bool no_prune: If this rule should not be pruned *EVEN IF* it is found to be
             unreachable (default=``False``)
+        :param float weight: The relative weight of this rule definition (default=``1.0``)
         """
         self.name = name
         self.options = options
@@ -642,8 +847,8 @@ class Def(Field):
         self.sep = self.options.setdefault("sep", self.sep)
         self.cat = self.options.setdefault("cat", self.cat)
         self.no_prune = self.options.setdefault("no_prune", self.no_prune)
+        self.weight = self.options.setdefault("weight", self.weight)
 
-        self.fuzzer = GramFuzzer.instance()
 
         frame,mod_path,_,_,_,_ = inspect.stack()[1]
         module_name = os.path.basename(mod_path).replace(".pyc", "").replace(".py", "")
@@ -660,10 +865,17 @@ class Def(Field):
         if pre is None:
             pre = []
 
+        if RECORDER is not None:
+            return _record_values(self.values, self.sep, pre, shortest)
+
         res = deque()
+        _val = utils.val
+        _skip = utils.SKIP
         for value in self.values:
             try:
-                res.append(utils.val(value, pre, shortest=shortest))
+                v = _val(value, pre, shortest=shortest)
+                if v is not _skip:
+                    res.append(v)
             except errors.FlushGrams as e:
                 prev = "".join(res)
                 res.clear()
@@ -684,7 +896,29 @@ class Def(Field):
 
         return self.sep.join(res)
 
+_PLAIN_CLASS_ATTRS = frozenset([
+    "__module__", "__qualname__", "__doc__", "__dict__", "__weakref__", "__slots__",
+    "_slot_names", "_defaults",
+])
+
+def _importable(cls):
+    module = sys.modules.get(cls.__module__, None)
+    return getattr(module, cls.__name__, None) is cls
+
+def _new_field(cls):
+    # used when unpickling a field as one of its base classes
+    return cls.__new__(cls)
+
 REF_LEVEL = 1
+
+# the size budget of the rule currently being generated. SIZE and NODES are
+# the number of characters built by completed ``Ref`` fields and the number
+# of ``Ref`` fields built so far, see ``GramFuzzer.gen``
+SIZE = 0
+NODES = 0
+MAX_SIZE = None
+MAX_NODES = None
+
 class Ref(Field):
     """The ``Ref`` class is used to reference defined rules by their name. If a
     rule name is defined multiple times, one will be chosen at random.
@@ -703,6 +937,8 @@ class Ref(Field):
         Def("float", Ref("integer"), ".", Ref("integer"))
     """
 
+    __slots__ = ("refname", "cat", "failsafe")
+
     cat = "default"
     """The default category where the referenced rule definition will be looked for
     """
@@ -721,7 +957,6 @@ class Ref(Field):
         self.cat = kwargs.setdefault("cat", self.cat)
         self.failsafe = kwargs.setdefault("failsafe", self.failsafe)
 
-        self.fuzzer = GramFuzzer.instance()
     
     def build(self, pre=None, shortest=False):
         """Build the ``Ref`` instance by fetching the rule from
@@ -730,22 +965,41 @@ class Ref(Field):
         :param list pre: The prerequisites list
         :param bool shortest: Whether or not the shortest reference-chain (most minimal) version of the field should be generated.
         """
-        global REF_LEVEL
+        global REF_LEVEL, SIZE, NODES
         REF_LEVEL += 1
+        NODES += 1
+        size = SIZE
 
         try:
             if pre is None:
                 pre = []
 
+            # once the size budget runs out, only the shortest version of the
+            # remaining references is built
+            if not shortest and ((MAX_SIZE is not None and size >= MAX_SIZE)
+                                 or (MAX_NODES is not None and NODES > MAX_NODES)):
+                shortest = True
+
             #print("{:04d} - {} - {}:{}".format(REF_LEVEL, shortest, self.cat, self.refname))
 
-            definition = self.fuzzer.get_ref(self.cat, self.refname)
+            fuzzer = self.fuzzer
+            refname,alt = fuzzer.get_ref_index(self.cat, self.refname)
+            definition = fuzzer.defs[self.cat][refname][alt]
+
+            recorder = RECORDER
+            if recorder is not None:
+                node = recorder.open(self.cat, refname, alt)
+
             res = utils.val(
                 definition,
                 pre,
                 shortest=(shortest or REF_LEVEL >= self.max_recursion)
             )
 
+            if recorder is not None:
+                recorder.close(node, res)
+
+            SIZE = size + len(res)
             return res
 
         # this needs to happen no matter what
@@ -766,6 +1020,8 @@ class PLUS(Join):
     The values are Anded together one or more times, up to ``max``
     times.
     """
+
+    __slots__ = ()
     sep = ""
 
     def __init__(self, *values, **kwargs):
@@ -780,6 +1036,8 @@ class STAR(PLUS):
     The values are Anded together zero or more times, up to ``max``
     times.
     """
+
+    __slots__ = ()
     shortest_is_nothing = True
 
     def build(self, pre=None, shortest=False):
@@ -792,8 +1050,8 @@ class STAR(PLUS):
             pre = []
 
         if shortest:
-            raise errors.OptGram
+            return utils.SKIP
         elif rand.maybe():
             return super(STAR, self).build(pre, shortest=shortest)
         else:
-            raise errors.OptGram
+            return utils.SKIP
@@ -11,9 +11,12 @@ such as:
 * random floats between a range
 * return ``True`` or ``False`` based on a probability (the ``maybe`` function)
 * return random data
+* choose an index from a cumulative probability table
+* choose an index from a weighted alias table in constant time
 """
 
 
+from bisect import bisect_right as _bisect
 import random as r
 
 
@@ -21,6 +24,8 @@ RANDOM = r.Random()
 _randint = RANDOM.randint
 random = _random = RANDOM.random
 choice = _choice = RANDOM.choice
+# random.choices() was added in python 3.6
+_choices = getattr(RANDOM, "choices", None)
 
 
 def seed(val):
@@ -86,4 +91,82 @@ def data(length, charset):
     :param str charset: The charset of characters to choose from
     :returns: str
     """
+    if _choices is not None:
+        return "".join(_choices(charset, k=length))
     return "".join(_choice(charset) for x in range(length))
+
+
+def cumulative(probs):
+    """Return the running totals of ``probs``, to be used with :any:`gramfuzz.rand.pick`
+
+    :param list probs: The list of probabilities
+    :returns: list
+    """
+    res = []
+    total = 0
+    for prob in probs:
+        total += prob
+        res.append(total)
+    return res
+
+
+def pick(table):
+    """Return the index of a randomly chosen item of the cumulative
+    probability table ``table``. If the random value falls past the end of the
+    table (the probabilities do not add up to 1.0), the last index is returned.
+
+    :param list table: The cumulative probability table created with :any:`gramfuzz.rand.cumulative`
+    :returns: int
+    """
+    idx = _bisect(table, _random())
+    if idx >= len(table):
+        idx = len(table) - 1
+    return idx
+
+
+def alias(weights):
+    """Create an alias table (Vose's alias method) from the list of relative
+    weights ``weights``, to be used with :any:`gramfuzz.rand.alias_choice`. Creating
+    the table is O(n), choosing from it is O(1).
+
+    :param list weights: The relative weights of each index (need not sum to 1.0)
+    :returns: tuple
+    """
+    weights = list(weights)
+    count = len(weights)
+    total = float(sum(weights))
+    if count == 0 or total <= 0 or min(weights) < 0:
+        raise ValueError("weights must be non-negative with a positive sum: {!r}".format(weights))
+
+    probs = [weight * count / total for weight in weights]
+    aliases = [0] * count
+    small = [idx for idx,prob in enumerate(probs) if prob < 1.0]
+    large = [idx for idx,prob in enumerate(probs) if prob >= 1.0]
+    while len(small) > 0 and len(large) > 0:
+        small_idx = small.pop()
+        large_idx = large.pop()
+        aliases[small_idx] = large_idx
+        probs[large_idx] = probs[large_idx] + probs[small_idx] - 1.0
+        if probs[large_idx] < 1.0:
+            small.append(large_idx)
+        else:
+            large.append(large_idx)
+
+    # whatever is left over is only off from 1.0 due to rounding
+    for idx in large + small:
+        probs[idx] = 1.0
+
+    return (probs, aliases)
+
+
+def alias_choice(table):
+    """Return a randomly chosen index from the alias table ``table``
+
+    :param tuple table: The alias table created with :any:`gramfuzz.rand.alias`
+    :returns: int
+    """
+    probs,aliases = table
+    idx = int(_random() * len(probs))
+    if _random() < probs[idx]:
+        return idx
+    return aliases[idx]
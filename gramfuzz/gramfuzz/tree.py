@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+
+"""
+This module defines the ``Derivation`` class, a compact record of
+which rules were used to build a generated value and where the text
+of each rule ended up in the result.
+"""
+
+
+from array import array
+
+
+class Derivation(object):
+    """A derivation tree of a single generated value. Every node is a rule
+    definition that was built (the top-level rule and every :any:`gramfuzz.fields.Ref`),
+    stored in pre-order in parallel arrays:
+
+    * ``rule`` - the index of the ``(category, rule name)`` tuple in ``rules``
+    * ``alt`` - the index of the chosen definition among the definitions sharing the rule name
+    * ``start`` / ``end`` - the span of the node's text in ``text``
+    * ``parent`` - the index of the parent node (``-1`` for the root)
+    * ``size`` - the number of nodes in the subtree rooted at the node
+
+    Since nodes are stored in pre-order, the subtree of node ``i`` is always the
+    range ``i`` to ``i + size[i]``.
+    """
+
+    def __init__(self):
+        """Create a new, empty ``Derivation``
+        """
+        self.text = None
+        self.rules = []
+        self.rule_ids = {}
+
+        self.rule = array("l")
+        self.alt = array("l")
+        self.start = array("l")
+        self.end = array("l")
+        self.parent = array("l")
+        self.size = array("l")
+
+        # used while the value is being built. Nodes whose position is not known
+        # yet relative to their parent node are "loose", and their start offset
+        # is relative to the text of the field currently being built
+        self._stack = []
+        self._loose = []
+
+    def __len__(self):
+        return len(self.rule)
+
+    def rule_name(self, node):
+        """Return the ``(category, rule name)`` tuple of the node ``node``
+
+        :param int node: The index of the node
+        :returns: tuple
+        """
+        return self.rules[self.rule[node]]
+
+    def span(self, node):
+        """Return the ``(start, end)`` offsets of the text of node ``node``
+
+        :param int node: The index of the node
+        :returns: tuple
+        """
+        return (self.start[node], self.end[node])
+
+    def depth(self, node):
+        """Return the depth of the node ``node`` (the root node has a depth of 0)
+
+        :param int node: The index of the node
+        :returns: int
+        """
+        res = 0
+        node = self.parent[node]
+        while node != -1:
+            res += 1
+            node = self.parent[node]
+        return res
+
+    def copy(self):
+        """Return a copy of this derivation
+
+        :returns: gramfuzz.tree.Derivation
+        """
+        res = Derivation()
+        res.text = self.text
+        res.rules = list(self.rules)
+        res.rule_ids = dict(self.rule_ids)
+        for name in ("rule", "alt", "start", "end", "parent", "size"):
+            setattr(res, name, array("l", getattr(self, name)))
+        return res
+
+    # --------------------------------------
+    # public, but intended for internal use
+    # --------------------------------------
+
+    def open(self, cat, def_name, alt):
+        """Add a new node for the rule definition ``def_name`` in the category
+        ``cat`` that is about to be built.
+
+        :param str cat: The category of the rule definition
+        :param str def_name: The name of the rule definition
+        :param int alt: The index of the chosen definition
+        :returns: int, the index of the new node
+        """
+        key = (cat, def_name)
+        rule_id = self.rule_ids.get(key, None)
+        if rule_id is None:
+            rule_id = self.rule_ids[key] = len(self.rules)
+            self.rules.append(key)
+
+        node = len(self.rule)
+        self.rule.append(rule_id)
+        self.alt.append(alt)
+        self.start.append(0)
+        self.end.append(0)
+        self.parent.append(self._stack[-1][0] if len(self._stack) > 0 else -1)
+        self.size.append(1)
+        self._stack.append((node, len(self._loose)))
+        return node
+
+    def close(self, node, text):
+        """Finish the node ``node`` that built the text ``text``. Any loose nodes built
+        since the node was opened now have offsets relative to ``text``.
+
+        :param int node: The index of the node
+        :param str text: The built text of the node
+        """
+        _,loose_mark = self._stack.pop()
+        del self._loose[loose_mark:]
+        # end holds the length until finish() is called
+        self.end[node] = len(text)
+        self.size[node] = len(self.rule) - node
+        self._loose.append(node)
+
+    def mark(self):
+        """Return the current build position, to be used with :any:`gramfuzz.tree.Derivation.drop`
+        and :any:`gramfuzz.tree.Derivation.place`
+
+        :returns: tuple
+        """
+        return (len(self._loose), len(self.rule))
+
+    def drop(self, mark):
+        """Throw away every node built since ``mark`` (e.g. the built text was
+        discarded or transformed)
+
+        :param tuple mark: A value returned by :any:`gramfuzz.tree.Derivation.mark`
+        """
+        loose_mark,node_mark = mark
+        del self._loose[loose_mark:]
+        for name in ("rule", "alt", "start", "end", "parent", "size"):
+            del getattr(self, name)[node_mark:]
+
+    def shift(self, mark, offset):
+        """Move every loose node built since ``mark`` by ``offset`` characters
+
+        :param tuple mark: A value returned by :any:`gramfuzz.tree.Derivation.mark`
+        :param int offset: The number of characters to move the nodes by
+        """
+        start = self.start
+        for node in self._loose[mark[0]:]:
+            start[node] += offset
+
+    def place(self, marks, pieces, sep):
+        """Position the loose nodes built for each of the ``pieces`` after they
+        are joined together with ``sep``.
+
+        :param list marks: The marks taken before each piece was built
+        :param list pieces: The built pieces
+        :param str sep: The separator the pieces are joined with
+        """
+        start = self.start
+        loose = self._loose
+        offset = 0
+        for idx in range(len(pieces)):
+            stop = marks[idx+1][0] if idx+1 < len(marks) else len(loose)
+            for node in loose[marks[idx][0]:stop]:
+                start[node] += offset
+            offset += len(pieces[idx]) + len(sep)
+
+    def finish(self, text):
+        """Finish the derivation of ``text``, converting relative node offsets
+        into absolute offsets.
+
+        :param str text: The generated value
+        """
+        self.text = text
+        self._stack = []
+        self._loose = []
+        start = self.start
+        end = self.end
+        parent = self.parent
+        for node in range(len(start)):
+            if parent[node] != -1:
+                start[node] += start[parent[node]]
+            end[node] += start[node]
+
+    def splice(self, node, other):
+        """Replace the subtree rooted at ``node`` (and its text) with the
+        finished derivation ``other``, updating the offsets of all following nodes.
+
+        :param int node: The index of the node to replace
+        :param gramfuzz.tree.Derivation other: The derivation that replaces the subtree
+        """
+        old_start = self.start[node]
+        old_end = self.end[node]
+        old_size = self.size[node]
+        new_size = len(other)
+        delta = len(other.text) - (old_end - old_start)
+        size_delta = new_size - old_size
+        after = node + old_size
+
+        self.text = self.text[:old_start] + other.text + self.text[old_end:]
+
+        rule_map = []
+        for key in other.rules:
+            rule_id = self.rule_ids.get(key, None)
+            if rule_id is None:
+                rule_id = self.rule_ids[key] = len(self.rules)
+                self.rules.append(key)
+            rule_map.append(rule_id)
+
+        parent = self.parent[node]
+        new_parent = array("l", [parent] + [p + node for p in other.parent[1:]])
+        tail_parent = array("l", [p + size_delta if p >= after else p for p in self.parent[after:]])
+
+        self.rule = self.rule[:node] + array("l", [rule_map[r] for r in other.rule]) + self.rule[after:]
+        self.alt = self.alt[:node] + other.alt + self.alt[after:]
+        self.start = (
+            self.start[:node]
+            + array("l", [s + old_start for s in other.start])
+            + array("l", [s + delta for s in self.start[after:]])
+        )
+        self.end = (
+            self.end[:node]
+            + array("l", [e + old_start for e in other.end])
+            + array("l", [e + delta for e in self.end[after:]])
+        )
+        self.parent = self.parent[:node] + new_parent + tail_parent
+        self.size = self.size[:node] + other.size + self.size[after:]
+
+        # ancestors of the replaced node grow or shrink along with it
+        while parent != -1:
+            self.end[parent] += delta
+            self.size[parent] += size_delta
+            parent = self.parent[parent]
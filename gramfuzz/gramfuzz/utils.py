@@ -10,24 +10,49 @@ Gramfuzz utility functions
 import gramfuzz
 
 
+class Skip(object):
+    """The type of the :any:`gramfuzz.utils.SKIP` sentinel. Building a field
+    that returns ``SKIP`` (e.g. an ``Opt`` that chose not to build its values)
+    tells the enclosing field to leave that value out, the same as raising
+    ``gramfuzz.errors.OptGram`` does, without the cost of raising and catching
+    an exception for every skipped value.
+    """
+
+    def __repr__(self):
+        return "<SKIP>"
+
+    def __str__(self):
+        return ""
+
+    def __bool__(self):
+        return False
+    __nonzero__ = __bool__
+
+SKIP = Skip()
+"""The sentinel returned from ``build()`` when the current value should be skipped
+"""
+
+
 def val(val, pre=None, shortest=False):
     """Build the provided value, while properly handling
     native Python types, :any:`gramfuzz.fields.Field` instances, and :any:`gramfuzz.fields.Field`
     subclasses.
 
     :param list pre: The prerequisites list
-    :returns: str
+    :returns: str, or :any:`gramfuzz.utils.SKIP` if the value should be skipped
     """
     if pre is None:
         pre = []
 
-    fields = gramfuzz.fields
-    MF = fields.MetaField
-    F = fields.Field
+    MF = gramfuzz.fields.MetaField
     if type(val) is MF:
         val = val()
 
-    if isinstance(val, F):
-        val = str(val.build(pre, shortest=shortest))
+    # same as isinstance(val, Field), but much faster since Field
+    # classes have a metaclass
+    if isinstance(type(val), MF):
+        val = val.build(pre, shortest=shortest)
+        if val is SKIP:
+            return SKIP
 
     return str(val)
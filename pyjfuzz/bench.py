@@ -0,0 +1,241 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from .core.pjf_configuration import PJFConfiguration
+from .core.pjf_external_fuzzer import PJFExternalFuzzer
+from .core.pjf_version import PYJFUZZ_VERSION
+from .core.pjf_encoder import PJFEncoder
+from .core.pjf_factory import PJFFactory
+from .core import GRAMMAR_PATH
+from argparse import Namespace
+import subprocess
+import tempfile
+import platform
+import argparse
+import socket
+import shutil
+import json
+import time
+import sys
+import os
+
+if sys.version_info >= (3, 0):
+    from urllib.request import urlopen
+else:
+    from urllib2 import urlopen
+
+# seed sizes in bytes used for the factory benchmarks
+SEED_SIZES = [1024, 16384, 262144]
+LEVELS = [0, 3, 6]
+# factory options benchmarked on every seed size, name -> configuration overrides
+OPTIONS = {
+    "default": {},
+    "strong_fuzz": {"strong_fuzz": True},
+    "url_encode": {"url_encode": True},
+    "indent": {"indent": True},
+    "utf8": {"utf8": True},
+}
+SIGSEGV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test", "sigsegv.c")
+
+
+def measure(func, duration):
+    """
+    Call func until duration seconds are elapsed, return the number of calls, the elapsed time and the rate
+    """
+    runs = 0
+    start = time.time()
+    elapsed = 0
+    while elapsed < duration:
+        func()
+        runs += 1
+        elapsed = time.time() - start
+    return {"runs": runs, "seconds": round(elapsed, 6), "per_second": round(runs / elapsed, 3)}
+
+
+def make_seed(size):
+    """
+    Build a deterministic JSON object whose serialization is about size bytes
+    """
+    seed = {"id": 1, "name": "seed", "enabled": True, "score": 1.5, "parent": None, "items": []}
+    index = 0
+    while len(json.dumps(seed)) < size:
+        seed["items"].append({"id": index, "name": "item %d" % index, "tags": ["a", "b"], "value": index * 0.5,
+                              "nested": {"flag": index % 2 == 0, "note": None}})
+        index += 1
+    return seed
+
+
+def make_config(**options):
+    """
+    Build a quiet configuration with a fixed seed
+    """
+    options.setdefault("nologo", True)
+    options.setdefault("seed", 1)
+    options.setdefault("level", 6)
+    return PJFConfiguration(Namespace(**options))
+
+
+def bench_factory(duration):
+    """
+    Testcases per second generated by PJFFactory.fuzzed for every seed size, level and option
+    """
+    results = {}
+    for size in SEED_SIZES:
+        seed = make_seed(size)
+        for level in LEVELS:
+            factory = PJFFactory(make_config(json=seed, level=level))
+            results["size_{0}_level_{1}".format(size, level)] = measure(lambda: factory.fuzzed, duration)
+        for name in sorted(OPTIONS):
+            factory = PJFFactory(make_config(json=seed, **OPTIONS[name]))
+            results["size_{0}_{1}".format(size, name)] = measure(lambda: factory.fuzzed, duration)
+    return results
+
+
+def bench_encoder(duration):
+    """
+    Nanoseconds spent by the encoder for every byte of output
+    """
+    results = {}
+    for size in SEED_SIZES:
+        obj = PJFFactory(make_config(json=make_seed(size))).fuzzed_object()
+        length = len("".join(PJFEncoder.fragments(obj)))
+        result = measure(lambda: PJFEncoder.fragments(obj), duration)
+        result["bytes"] = length
+        result["ns_per_byte"] = round(result["seconds"] * 1e9 / (result["runs"] * length), 3)
+        results["size_{0}".format(size)] = result
+    return results
+
+
+def bench_grammar(duration):
+    """
+    Documents per second generated by GramFuzzer.gen with the JSON grammar
+    """
+    try:
+        from gramfuzz import GramFuzzer
+    except ImportError:
+        return {"skipped": "gramfuzz is not installed"}
+    grammar = GramFuzzer()
+    grammar.load_grammar(GRAMMAR_PATH)
+    result = measure(lambda: grammar.gen(cat="json", num=10, max_recursion=10), duration)
+    result["docs_per_second"] = round(result["per_second"] * 10, 3)
+    return {"json": result}
+
+
+def bench_external(duration):
+    """
+    Executions per second of PJFExternalFuzzer against test/sigsegv.c
+    """
+    if not os.path.isfile(SIGSEGV_PATH):
+        return {"skipped": "{0} not found".format(SIGSEGV_PATH)}
+    build_dir = tempfile.mkdtemp()
+    try:
+        binary = os.path.join(build_dir, "sigsegv")
+        try:
+            subprocess.Popen(["gcc", SIGSEGV_PATH, "-o", binary], stderr=subprocess.PIPE,
+                             stdout=subprocess.PIPE).wait()
+        except OSError:
+            return {"skipped": "gcc is not available"}
+        if not os.path.isfile(binary):
+            return {"skipped": "unable to compile {0}".format(SIGSEGV_PATH)}
+        executor = PJFExternalFuzzer(make_config(command=[binary], stdin=True))
+        return {"sigsegv": measure(lambda: executor.execute_sigsegv("{}"), duration)}
+    finally:
+        shutil.rmtree(build_dir)
+
+
+def bench_server(duration):
+    """
+    Requests per second served by the built-in HTTP server
+    """
+    try:
+        from .core.pjf_server import PJFServer
+    except ImportError:
+        return {"skipped": "bottle is not installed"}
+    config = make_config(json=make_seed(SEED_SIZES[0]), debug=False, content_type=False, notify=False)
+    ports = {"servers": {}}
+    for name in ["HTTP_PORT", "HTTPS_PORT", "TCASE_PORT"]:
+        ports["servers"][name] = config.get_free_port()
+    setattr(config, "ports", ports)
+    server = PJFServer(config)
+    server.run()
+    url = "http://127.0.0.1:{0}/".format(ports["servers"]["HTTP_PORT"])
+    try:
+        for _ in range(0, 50):
+            try:
+                socket.create_connection(("127.0.0.1", ports["servers"]["HTTP_PORT"]), 1).close()
+                break
+            except socket.error:
+                time.sleep(0.1)
+        return {"http": measure(lambda: urlopen(url).read(), duration)}
+    finally:
+        server.stop()
+
+
+BENCHMARKS = {
+    "factory": bench_factory,
+    "encoder": bench_encoder,
+    "grammar": bench_grammar,
+    "external": bench_external,
+    "server": bench_server,
+}
+
+
+def run(names=None, duration=1.0):
+    """
+    Run the selected benchmarks (all by default) and return the results
+    """
+    results = {}
+    for name in names or sorted(BENCHMARKS):
+        results[name] = BENCHMARKS[name](duration)
+    return {
+        "version": PYJFUZZ_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": int(time.time()),
+        "duration": duration,
+        "results": results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PyJFuzz benchmark suite, results are printed as JSON')
+    parser.add_argument('-d', metavar='SECONDS', help='Time spent on every measure', type=float, default=1.0,
+                        dest='duration')
+    parser.add_argument('-o', metavar='FILE', help='Write the results to FILE instead of stdout', default=None,
+                        dest='output')
+    parser.add_argument('benchmarks', nargs='*', help='Benchmarks to run ({0}), all by default'.format(
+        ", ".join(sorted(BENCHMARKS))))
+    args = parser.parse_args()
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error("Unknown benchmark {0}".format(name))
+    results = json.dumps(run(args.benchmarks, args.duration), indent=4, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(results)
+            output.close()
+    else:
+        sys.stdout.write("{0}\n".format(results))
+
+if __name__ == "__main__":
+    main()
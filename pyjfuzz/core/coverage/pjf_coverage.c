@@ -0,0 +1,72 @@
+/*
+ * PyJFuzz coverage shim
+ *
+ * Link this file with a target compiled with SanitizerCoverage to let PyJFuzz collect edge coverage.
+ * The shim itself must NOT be instrumented, so compile it separately:
+ *
+ *   cc -c pjf_coverage.c -o pjf_coverage.o
+ *   clang -fsanitize-coverage=trace-pc-guard target.c pjf_coverage.o -o target
+ *   gcc -fsanitize-coverage=trace-pc target.c pjf_coverage.o -o target
+ *
+ * PyJFuzz passes the path of the shared bitmap inside the PJF_COV_PATH environment variable, when the
+ * variable is missing the target runs normally and coverage goes to a private dummy map.
+ */
+#include <stdint.h>
+#include <stdlib.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+
+#define PJF_MAP_SIZE 65536
+
+static uint8_t pjf_dummy_map[PJF_MAP_SIZE];
+static uint8_t *pjf_map = NULL;
+static uintptr_t pjf_prev_loc = 0;
+
+static uint8_t *pjf_get_map(void) {
+    const char *path;
+    void *map;
+    int fd;
+
+    if (pjf_map)
+        return pjf_map;
+    pjf_map = pjf_dummy_map;
+    path = getenv("PJF_COV_PATH");
+    if (!path)
+        return pjf_map;
+    fd = open(path, O_RDWR);
+    if (fd < 0)
+        return pjf_map;
+    map = mmap(NULL, PJF_MAP_SIZE, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+    close(fd);
+    if (map != MAP_FAILED)
+        pjf_map = (uint8_t *) map;
+    return pjf_map;
+}
+
+/* clang -fsanitize-coverage=trace-pc-guard */
+void __sanitizer_cov_trace_pc_guard_init(uint32_t *start, uint32_t *stop) {
+    static uint32_t pjf_guards = 0;
+    uint32_t *guard;
+
+    if (start == stop || *start)
+        return;
+    pjf_get_map();
+    for (guard = start; guard < stop; guard++)
+        *guard = (pjf_guards++ % (PJF_MAP_SIZE - 1)) + 1;
+}
+
+void __sanitizer_cov_trace_pc_guard(uint32_t *guard) {
+    if (!*guard)
+        return;
+    pjf_get_map()[*guard]++;
+}
+
+/* gcc -fsanitize-coverage=trace-pc, addresses are taken relative to the shim to survive ASLR */
+void __sanitizer_cov_trace_pc(void) {
+    uintptr_t loc = (uintptr_t) __builtin_return_address(0) - (uintptr_t) &pjf_get_map;
+
+    loc = ((loc >> 4) ^ (loc << 8)) & (PJF_MAP_SIZE - 1);
+    pjf_get_map()[loc ^ pjf_prev_loc]++;
+    pjf_prev_loc = loc >> 1;
+}
@@ -100,6 +100,12 @@ class PJFProcessExecutionError(PJFProcessError):
     Error during process execution
     """
 
+class PJFTimeoutError(PJFProcessError):
+    """
+    Execution took longer than allowed
+    """
+    err_type = "TIMEOUT"
+
 class PJFMalformedJSON(PJFInvalidJSON):
     """
     Invalid argument passed to PyJFuzz
@@ -0,0 +1,112 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import sys
+import os
+
+if sys.version_info >= (3, 0):
+    unicode = str
+
+
+class PJFBuffers(object):
+    """
+    Helpers used to hand around testcases as lists of buffers and write them with scatter-gather calls
+    """
+
+    # fragments are coalesced into chunks of about this size
+    CHUNK_SIZE = 65536
+    # maximum number of buffers passed to a single sendmsg / writev call
+    IOV_MAX = 1024
+
+    @staticmethod
+    def to_bytes(fragment):
+        """
+        Return a fragment as bytes
+        """
+        if isinstance(fragment, unicode):
+            return fragment.encode("utf-8")
+        return fragment
+
+    @staticmethod
+    def coalesce(fragments, size=CHUNK_SIZE):
+        """
+        Join small text fragments into bytes chunks, fragments bigger than size are kept on their own
+        """
+        chunks = []
+        run = []
+        length = 0
+        for fragment in fragments:
+            if len(fragment) >= size:
+                if run:
+                    chunks.append(PJFBuffers.to_bytes("".join(run)))
+                    run, length = [], 0
+                chunks.append(PJFBuffers.to_bytes(fragment))
+                continue
+            run.append(fragment)
+            length += len(fragment)
+            if length >= size:
+                chunks.append(PJFBuffers.to_bytes("".join(run)))
+                run, length = [], 0
+        if run:
+            chunks.append(PJFBuffers.to_bytes("".join(run)))
+        return chunks
+
+    @staticmethod
+    def advance(buffers, written):
+        """
+        Drop the first written bytes from a list of memoryviews
+        """
+        index = 0
+        while index < len(buffers) and written >= len(buffers[index]):
+            written -= len(buffers[index])
+            index += 1
+        buffers = buffers[index:]
+        if written:
+            buffers[0] = buffers[0][written:]
+        return buffers
+
+    @staticmethod
+    def send(sock, buffers):
+        """
+        Send all the buffers over a connected socket, using sendmsg when available
+        """
+        if not hasattr(sock, "sendmsg"):
+            sock.sendall(b"".join(buffers))
+            return
+        buffers = [memoryview(b) for b in buffers if len(b)]
+        while buffers:
+            buffers = PJFBuffers.advance(buffers, sock.sendmsg(buffers[:PJFBuffers.IOV_MAX]))
+
+    @staticmethod
+    def write(fd, buffers):
+        """
+        Write all the buffers to a file descriptor, using writev when available
+        """
+        if not hasattr(os, "writev"):
+            data = b"".join(buffers)
+            while data:
+                data = data[os.write(fd, data):]
+            return
+        buffers = [memoryview(b) for b in buffers if len(b)]
+        while buffers:
+            buffers = PJFBuffers.advance(buffers, os.writev(fd, buffers[:PJFBuffers.IOV_MAX]))
@@ -29,9 +29,10 @@ from ast import literal_eval
 from .conf import CONF_PATH
 from argparse import Namespace
 from .pjf_version import PYJFUZZ_LOGO
-from .pjf_grammar import generate_json
+from .pjf_grammar import generate_json, generate_corpus
+from .pjf_seed import PJFSeed
 from . import GRAMMAR_PATH
-from .errors import PJFInvalidType
+from .errors import PJFInvalidType, PJFInvalidArgument
 
 class PJFConfiguration(Namespace):
     """
@@ -43,6 +44,7 @@ class PJFConfiguration(Namespace):
         """
         super(PJFConfiguration, self).__init__(**arguments.__dict__)
         setattr(self, "generate_json", generate_json)
+        setattr(self, "generate_corpus", generate_corpus)
         setattr(self, "grammar_path", GRAMMAR_PATH)
         if self.json:
             if type(self.json) != dict:
@@ -60,6 +62,26 @@ class PJFConfiguration(Namespace):
         if self.parameters:
             if type(self.parameters) != str:
                 raise PJFInvalidType(self.parameters, str)
+        if self.seed is False or self.seed is None:
+            self.seed = PJFSeed.generate()
+        elif type(self.seed) != int:
+            raise PJFInvalidType(self.seed, int)
+        elif self.seed < 0:
+            raise PJFInvalidArgument("Seed must be a positive integer")
+        elif self.seed > PJFSeed.MAX_SEED:
+            raise PJFInvalidArgument("Seed must fit in 64 bits")
+        if self.havoc_stack is not False and self.havoc_stack is not None:
+            if type(self.havoc_stack) != int:
+                raise PJFInvalidType(self.havoc_stack, int)
+            elif self.havoc_stack < 1:
+                raise PJFInvalidArgument("Havoc stack must be at least 1")
+        if self.havoc_time:
+            if type(self.havoc_time) != int:
+                raise PJFInvalidType(self.havoc_time, int)
+            elif self.havoc_time < 0:
+                raise PJFInvalidArgument("Havoc time must not be negative")
+        if not self.worker_id:
+            self.worker_id = 0
         if not self.nologo:
             sys.stderr.write("{0}\n".format(PYJFUZZ_LOGO))
         if self.recheck_ports:
@@ -99,7 +121,8 @@ class PJFConfiguration(Namespace):
         if not self.parameters:
             self.parameters = []
         if self.auto:
-            self.json = self.generate_json(self.grammar_path)
+            self.json = self.generate_json(self.grammar_path, PJFSeed.derive(self.seed, self.worker_id),
+                                           self.auto_size)
 
     def __contains__(self, items):
         if type(items) != list:
@@ -118,6 +141,9 @@ class PJFConfiguration(Namespace):
         if item in self.__dict__:
             return self.__dict__[item]
         else:
+            if item.startswith("__"):
+                # keep the default protocols (pickle, copy) working
+                raise AttributeError(item)
             if item == "recheck_ports":
                 return True
             return False
@@ -127,6 +153,9 @@ class PJFConfiguration(Namespace):
         Parse the command line and start PyJFuzz
         """
         from .pjf_worker import PJFWorker
+        if self.profile or self.profile_sample or self.profile_memory:
+            from .pjf_profiler import PJFProfiler
+            PJFProfiler(self).install()
         worker = PJFWorker(self)
         if self.update_pjf:
             worker.update_library()
@@ -143,12 +172,16 @@ class PJFConfiguration(Namespace):
                 else:
                     worker.fuzz_command_line()
             elif self.cmd_fuzz:
-                if self.stdin:
+                if self.coverage or self.adaptive:
+                    worker.fuzz_corpus()
+                elif self.stdin:
                     worker.fuzz_external(True)
                 else:
                     worker.fuzz_external()
             else:
                 worker.start_http_server()
+        elif self.corpus_dir:
+            worker.fuzz_corpus()
         elif self.json_file:
             worker.start_file_fuzz()
         elif self.process_to_monitor:
@@ -194,6 +227,18 @@ class PJFConfiguration(Namespace):
         except IOError:
             raise parser.error("File does not exists!")
 
+    @staticmethod
+    def valid_size(value):
+        import argparse
+        parser = argparse.ArgumentParser()
+        try:
+            min_size, max_size = [int(size) for size in value.split(":")]
+            if min_size < 0 or max_size < min_size:
+                raise ValueError
+        except ValueError:
+            raise parser.error("Please insert a valid size range MIN:MAX!")
+        return min_size, max_size
+
     @staticmethod
     def valid_json(value):
         import argparse
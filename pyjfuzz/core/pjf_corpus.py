@@ -0,0 +1,209 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from .errors import PJFBaseException
+from .pjf_logger import PJFLogger
+import time
+import json
+import sys
+import os
+if sys.version_info >= (3, 0):
+    import urllib.parse
+else:
+    import urllib
+
+
+class PJFCorpus(object):
+    """
+    Represent a growing set of JSON objects used as starting point for mutations
+    """
+
+    # number of testcases generated from an entry with an average score
+    BASE_ENERGY = 32
+    MAX_ENERGY = 1024
+
+    def __init__(self, configuration):
+        """
+        Init an empty corpus, entries are cycled through by schedule()
+        """
+        self.logger = self.init_logger()
+        self.config = configuration
+        self.entries = []
+        self.saved = 0
+        self.position = 0
+        self.total_size = 0
+        self.total_time = 0.0
+        self.total_execs = 0
+        self.logger.debug("[{0}] - PJFCorpus successfully initialized".format(time.strftime("%H:%M:%S")))
+
+    def __len__(self):
+        """
+        Number of entries inside the corpus
+        """
+        return len(self.entries)
+
+    def add(self, obj, name=None):
+        """
+        Add a new entry to the corpus, return the entry record
+        """
+        size = len(obj) if type(obj) not in (dict, list) else len(json.dumps(obj))
+        entry = {
+            "json": obj,
+            "name": name or "entry_{0}".format(len(self.entries)),
+            "size": size,
+            "execs": 0,
+            "time": 0.0,
+            "findings": 0
+        }
+        self.entries.append(entry)
+        self.total_size += size
+        return entry
+
+    def load_dir(self, dir_name):
+        """
+        Parse every JSON file inside a directory once and add it to the corpus
+        """
+        for name in sorted(os.listdir(dir_name)):
+            path = os.path.join(dir_name, name)
+            if not os.path.isfile(path):
+                continue
+            with open(path, "rb") as seed:
+                content = seed.read().decode("utf-8", "replace")
+                seed.close()
+            if self.config.strong_fuzz:
+                self.add(content, name)
+                continue
+            try:
+                obj = json.loads(content, strict=False)
+            except ValueError:
+                obj = None
+            if type(obj) not in (dict, list):
+                self.logger.debug("[{0}] - Skipping {1}, not a valid JSON object".format(time.strftime("%H:%M:%S"),
+                                                                                         path))
+                continue
+            self.add(obj, name)
+        if len(self.entries) == 0:
+            raise PJFBaseException("No valid JSON object found inside {0}".format(dir_name))
+
+    def schedule(self):
+        """
+        Cycle through the corpus, return the next entry and the number of testcases to generate from it
+        """
+        entry = self.entries[self.position % len(self.entries)]
+        self.position = (self.position + 1) % len(self.entries)
+        return entry, self.energy(entry)
+
+    def energy(self, entry):
+        """
+        Score an entry, small fast and productive entries are mutated more than big slow ones
+        """
+        score = 100.0
+        if entry["execs"] and self.total_execs and self.total_time:
+            ratio = (entry["time"] / entry["execs"]) / (self.total_time / self.total_execs)
+            if ratio > 10:
+                score = 10
+            elif ratio > 4:
+                score = 25
+            elif ratio > 2:
+                score = 50
+            elif ratio > 1.33:
+                score = 75
+            elif ratio < 0.25:
+                score = 300
+            elif ratio < 0.33:
+                score = 200
+            elif ratio < 0.5:
+                score = 150
+        if self.total_size:
+            ratio = float(entry["size"]) / (float(self.total_size) / len(self.entries))
+            if ratio > 4:
+                score *= 0.25
+            elif ratio > 2:
+                score *= 0.5
+            elif ratio < 0.25:
+                score *= 2
+            elif ratio < 0.5:
+                score *= 1.5
+        if entry["execs"] == 0:
+            # give newly added entries a chance to prove themselves
+            score *= 2
+        score *= min(1 + entry["findings"], 4)
+        return max(1, min(self.MAX_ENERGY, int(self.BASE_ENERGY * score / 100)))
+
+    def record(self, entry, elapsed, finding=False):
+        """
+        Update the statistics of an entry after one of its testcases has been executed
+        """
+        entry["execs"] += 1
+        entry["time"] += elapsed
+        self.total_execs += 1
+        self.total_time += elapsed
+        if finding:
+            entry["findings"] += 1
+
+    def parse(self, testcase):
+        """
+        Turn a testcase back into a corpus entry, return None if it cannot be used as a seed anymore
+        """
+        if self.config.url_encode:
+            if sys.version_info >= (3, 0):
+                testcase = urllib.parse.unquote(testcase)
+            else:
+                testcase = urllib.unquote(testcase)
+        if self.config.strong_fuzz:
+            return testcase
+        try:
+            obj = json.loads(testcase, strict=False)
+        except ValueError:
+            return None
+        if type(obj) not in (dict, list):
+            return None
+        return obj
+
+    def save(self, dir_name, obj):
+        """
+        Save an entry inside the corpus directory, return the path of the saved file
+        """
+        try:
+            try:
+                os.mkdir(dir_name)
+            except OSError:
+                pass
+            path = "{0}/entry_{1}.json".format(dir_name, self.saved)
+            with open(path, "wb") as entry:
+                if type(obj) in (dict, list):
+                    obj = json.dumps(obj)
+                if not isinstance(obj, bytes):
+                    obj = obj.encode("utf-8")
+                entry.write(obj)
+                entry.close()
+            self.saved += 1
+            return path
+        except Exception as e:
+            raise PJFBaseException(e.message if hasattr(e, "message") else str(e))
+
+    def init_logger(self):
+        """
+        Init the default logger
+        """
+        return PJFLogger.init_logger()
@@ -0,0 +1,106 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from .errors import PJFBaseException
+from .pjf_logger import PJFLogger
+import tempfile
+import mmap
+import time
+import re
+import os
+
+
+class PJFCoverage(object):
+    """
+    Represent the shared memory bitmap filled by a target instrumented with the coverage shim
+    """
+
+    MAP_SIZE = 65536
+
+    NON_ZERO = re.compile(b"[^\x00]+")
+
+    # hit counts are grouped in buckets, a new bucket for a known edge still counts as new coverage
+    BUCKETS = bytearray([0, 1, 2, 4] + [8] * 4 + [16] * 8 + [32] * 16 + [64] * 96 + [128] * 128)
+
+    def __init__(self, configuration=None):
+        """
+        Create the bitmap inside a shared memory backed file
+        """
+        self.logger = self.init_logger()
+        try:
+            shm_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+            fd, self.path = tempfile.mkstemp(prefix="pjf_cov_", dir=shm_dir)
+            os.write(fd, b"\x00" * self.MAP_SIZE)
+            self.bitmap = mmap.mmap(fd, self.MAP_SIZE)
+            os.close(fd)
+        except (OSError, IOError, mmap.error) as e:
+            raise PJFBaseException(e.message if hasattr(e, "message") else str(e))
+        self.virgin = bytearray(self.MAP_SIZE)
+        self.env = dict(os.environ, PJF_COV_PATH=self.path)
+        self.logger.debug("[{0}] - PJFCoverage successfully initialized".format(time.strftime("%H:%M:%S")))
+
+    def reset(self):
+        """
+        Clear the bitmap before a new execution
+        """
+        self.bitmap.seek(0)
+        self.bitmap.write(b"\x00" * self.MAP_SIZE)
+
+    def update(self):
+        """
+        Merge the bitmap of the last execution, return the number of new edges (or hit buckets) reached
+        """
+        data = self.bitmap[:]
+        trace = bytearray(data)
+        new = 0
+        for block in self.NON_ZERO.finditer(data):
+            for i in range(block.start(), block.end()):
+                bucket = self.BUCKETS[trace[i]]
+                if not self.virgin[i] & bucket:
+                    self.virgin[i] |= bucket
+                    new += 1
+        return new
+
+    @property
+    def edges(self):
+        """
+        Number of edges reached so far
+        """
+        return self.MAP_SIZE - self.virgin.count(b"\x00")
+
+    def close(self):
+        """
+        Release the bitmap
+        """
+        try:
+            self.bitmap.close()
+            os.unlink(self.path)
+        except (OSError, IOError):
+            pass
+        self.logger.debug("[{0}] - PJFCoverage successfully completed".format(time.strftime("%H:%M:%S")))
+
+    def init_logger(self):
+        """
+        Init the default logger
+        """
+        return PJFLogger.init_logger()
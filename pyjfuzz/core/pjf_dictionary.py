@@ -0,0 +1,116 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from .errors import PJFBaseException
+from .pjf_logger import PJFLogger
+import time
+import re
+
+
+class PJFDictionary(object):
+    """
+    Represent an indexed table of tokens (magic keys, enum values, keywords) used by the mutators
+    """
+
+    # AFL -x format: name="value" or "value", optionally followed by @level
+    AFL_TOKEN = re.compile(r'^(?:[A-Za-z0-9_]+\s*=\s*)?"(.*)"(?:\s*@\s*[0-9]+)?$')
+    AFL_ESCAPE = re.compile(r'\\(x[0-9A-Fa-f]{2}|\\|")')
+
+    def __init__(self, configuration=None):
+        """
+        Init the token table, load the dictionary file specified inside the configuration if any
+        """
+        self.logger = self.init_logger()
+        self.config = configuration
+        self.tokens = []
+        self.index = {}
+        if configuration and configuration.dictionary:
+            self.load(configuration.dictionary)
+        self.logger.debug("[{0}] - PJFDictionary successfully initialized".format(time.strftime("%H:%M:%S")))
+
+    def __len__(self):
+        """
+        Number of tokens inside the dictionary
+        """
+        return len(self.tokens)
+
+    def __getitem__(self, item):
+        """
+        Return the token at the given index
+        """
+        return self.tokens[item]
+
+    def add(self, token):
+        """
+        Add a token to the table, duplicates are ignored
+        """
+        if token and token not in self.index:
+            self.index[token] = len(self.tokens)
+            self.tokens.append(token)
+
+    def load(self, path):
+        """
+        Load an AFL dictionary or a plain list of tokens, one per line
+        """
+        try:
+            with open(path, "rb") as dictionary:
+                content = dictionary.read().decode("latin-1")
+                dictionary.close()
+        except Exception as e:
+            raise PJFBaseException(e.message if hasattr(e, "message") else str(e))
+        for line in content.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            self.add(self.parse_line(line))
+
+    def parse_line(self, line):
+        """
+        Return the token described by a dictionary line
+        """
+        match = self.AFL_TOKEN.match(line)
+        if not match:
+            return line
+        return self.AFL_ESCAPE.sub(self.unescape, match.group(1))
+
+    @staticmethod
+    def unescape(match):
+        """
+        Decode an AFL escape sequence (\\xNN, \\\\ or \\")
+        """
+        sequence = match.group(1)
+        if sequence[0] == "x":
+            return chr(int(sequence[1:], 16))
+        return sequence
+
+    def choice(self, rng):
+        """
+        Return a random token using the given generator
+        """
+        return self.tokens[rng.randint(0, len(self.tokens) - 1)]
+
+    def init_logger(self):
+        """
+        Init the default logger
+        """
+        return PJFLogger.init_logger()
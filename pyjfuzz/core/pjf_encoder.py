@@ -26,81 +26,160 @@ import json
 import sys
 import re
 
+if sys.version_info >= (3, 0):
+    import urllib.parse
+    unicode = str
+else:
+    import urllib
+
+
 class PJFEncoder(object):
     """
     Class that represent a JSON encoder / decoder
     """
 
+    # json.dumps separators, with indent python 2 keeps the trailing space after commas
+    ITEM_SEPARATOR = ", "
+    INDENT_ITEM_SEPARATOR = "," if sys.version_info >= (3, 0) else ", "
+    KEY_SEPARATOR = ": "
+    INDENT = 5
+
+    hex_regex = re.compile(r"(\\\\x[a-fA-F0-9]{2})")
+    unicode_regex = re.compile(r"(\\u[a-fA-F0-9]{4})")
+    # strings left unchanged by decode and encode, lists made of them and numbers are serialized in a single call
+    plain_regex = re.compile(r"^[ -\[\]-~]*$")
+    PLAIN_TYPES = set([int, float, bool, type(None), str, unicode])
+
+    # percent encoding of every byte, same result as urllib quote with the default safe characters
+    if sys.version_info >= (3, 0):
+        QUOTE_TABLE = dict((i, urllib.parse.quote(bytes([i]))) for i in range(0, 256))
+    else:
+        QUOTE_TABLE = None
+
     @staticmethod
     def json_encode(func):
         """
         Decorator used to change the return value from PJFFactory.fuzzed, it makes the structure printable
         """
         def func_wrapper(self, indent, utf8):
-            if utf8:
-                encoding = "\\x%02x"
+            return "".join(PJFEncoder.fragments(func(self), indent, utf8, getattr(self, "frozen", None),
+                                                getattr(self, "fragments", None)))
+
+        return func_wrapper
+
+    @staticmethod
+    def quote(fragment):
+        """
+        URL encode a fragment, the utf-8 bytes are mapped through the quote table in a single pass
+        """
+        if PJFEncoder.QUOTE_TABLE is None:
+            return urllib.quote(fragment)
+        return fragment.encode("utf-8").decode("latin-1").translate(PJFEncoder.QUOTE_TABLE)
+
+    @staticmethod
+    def fragments(obj, indent=False, utf8=False, frozen=None, cache=None, url_encode=False):
+        """
+        Serialize an object like json.dumps into a list of printable fragments, the containers whose id is
+        inside frozen are serialized once and then taken from cache. With url_encode every fragment is quoted
+        """
+        if utf8:
+            encoding = "\\x%02x"
+        else:
+            encoding = "\\u%04x"
+        if indent:
+            item_separator = PJFEncoder.INDENT_ITEM_SEPARATOR
+        else:
+            item_separator = PJFEncoder.ITEM_SEPARATOR
+        if not frozen or cache is None:
+            frozen = ()
+
+        def decode(x):
+            tmp = "".join(encoding % ord(c) if c not in p else c for c in x)
+            if sys.version_info >= (3, 0):
+                return str(tmp)
             else:
-                encoding = "\\u%04x"
-            hex_regex = re.compile(r"(\\\\x[a-fA-F0-9]{2})")
-            unicode_regex = re.compile(r"(\\u[a-fA-F0-9]{4})")
-
-            def encode_decode_all(d, _decode=True):
-                if type(d) == dict:
-                    for k in d:
-                        if type(d[k]) in [dict, list]:
-                            if _decode:
-                                d[k] = encode_decode_all(d[k])
-                            else:
-                                d[k] = encode_decode_all(d[k], _decode=False)
-                        elif type(d[k]) == str:
-                            if _decode:
-                                d[k] = decode(d[k])
-                            else:
-                                d[k] = encode(d[k])
-                elif type(d) == list:
-                    arr = []
-                    for e in d:
-                        if type(e) == str:
-                            if _decode:
-                                arr.append(decode(e))
-                            else:
-                                arr.append(encode(e))
-                        elif type(e) in [dict, list]:
-                            if _decode:
-                                arr.append(encode_decode_all(e))
-                            else:
-                                arr.append(encode_decode_all(e, _decode=False))
-                        else:
-                            arr.append(e)
-                    return arr
-                else:
-                    if _decode:
-                        return decode(d)
-                    else:
-                        return encode(d)
-                return d
-
-            def decode(x):
-                tmp = "".join(encoding % ord(c) if c not in p else c for c in x)
+                for encoded in PJFEncoder.unicode_regex.findall(tmp):
+                    tmp = tmp.replace(encoded, encoded.decode("unicode_escape"))
+                return unicode(tmp)
+
+        def encode(x):
+            if "\\\\x" not in x:
+                return x
+            for encoded in PJFEncoder.hex_regex.findall(x):
                 if sys.version_info >= (3, 0):
-                    return str(tmp)
+                    x = x.replace(encoded, bytes(str(encoded).replace("\\\\x", "\\x"), "utf-8").decode("unicode_escape"))
                 else:
-                    for encoded in unicode_regex.findall(tmp):
-                        tmp = tmp.replace(encoded, encoded.decode("unicode_escape"))
-                    return unicode(tmp)
-
-            def encode(x):
-                for encoded in hex_regex.findall(x):
-                    if sys.version_info >= (3, 0):
-                        x = x.replace(encoded, bytes(str(encoded).replace("\\\\x", "\\x"),"utf-8").decode("unicode_escape"))
-                    else:
-                        x = x.replace(encoded, str(encoded).replace("\\\\x", "\\x").decode("string_escape"))
-                return x
+                    x = x.replace(encoded, str(encoded).replace("\\\\x", "\\x").decode("string_escape"))
+            return x
+
+        def plain(element):
+            types = set(map(type, element))
+            if not types <= PJFEncoder.PLAIN_TYPES:
+                return False
+            if str in types or unicode in types:
+                match = PJFEncoder.plain_regex.match
+                return all(match(x) for x in element if isinstance(x, (str, unicode)))
+            return True
+
+        def emit(parts, fragment):
+            if url_encode:
+                fragment = PJFEncoder.quote(fragment)
+            parts.append(fragment)
 
+        def write(element, parts, depth, lookup=True):
+            if type(element) in [dict, list]:
+                if lookup and id(element) in frozen:
+                    key = (id(element), depth, indent, utf8, url_encode)
+                    if key not in cache:
+                        fragment = []
+                        container(element, fragment, depth, False)
+                        # keep a reference to the object, its id must not be reused while cached
+                        cache[key] = (element, "".join(fragment))
+                    parts.append(cache[key][1])
+                else:
+                    container(element, parts, depth, lookup)
+            elif type(element) == str:
+                emit(parts, encode(json.dumps(decode(element))))
+            else:
+                emit(parts, encode(json.dumps(element)))
+
+        def container(element, parts, depth, lookup):
+            if type(element) == dict:
+                items = element.items()
+                start, end = "{", "}"
+            else:
+                items = element
+                start, end = "[", "]"
+            if not element:
+                emit(parts, start + end)
+                return
+            if end == "]" and not indent and plain(element):
+                emit(parts, json.dumps(element, separators=(item_separator, PJFEncoder.KEY_SEPARATOR)))
+                return
             if indent:
-                return encode_decode_all("{0}".format(json.dumps(encode_decode_all(func(self)), indent=5)),
-                                         _decode=False)
+                separator = item_separator + "\n" + " " * PJFEncoder.INDENT * (depth + 1)
+                emit(parts, start + "\n" + " " * PJFEncoder.INDENT * (depth + 1))
             else:
-                return encode_decode_all("{0}".format(json.dumps(encode_decode_all(func(self)))), _decode=False)
+                separator = item_separator
+                emit(parts, start)
+            if url_encode:
+                separator = PJFEncoder.quote(separator)
+            first = True
+            for item in items:
+                if not first:
+                    parts.append(separator)
+                first = False
+                if end == "}":
+                    key, item = item
+                    if not isinstance(key, (str, unicode)):
+                        key = json.dumps(key)
+                    emit(parts, encode(json.dumps(key)) + PJFEncoder.KEY_SEPARATOR)
+                write(item, parts, depth + 1, lookup)
+            if indent:
+                emit(parts, "\n" + " " * PJFEncoder.INDENT * depth + end)
+            else:
+                emit(parts, end)
 
-        return func_wrapper
+        parts = []
+        write(obj, parts, 0)
+        return parts
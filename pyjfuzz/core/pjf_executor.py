@@ -26,17 +26,19 @@ from .errors import PJFInvalidType, PJFProcessExecutionError, PJFBaseException
 from threading import Thread
 from subprocess import PIPE
 from .pjf_logger import PJFLogger
+from .pjf_buffers import PJFBuffers
 from select import error
 import subprocess
 import signal
 import time
-import sys
 
 class PJFExecutor(object):
     """
     Main class used to spawn and kill processes
     """
 
+    env = None
+
     def __init__(self, arg=None):
         """
         Init the main class
@@ -44,6 +46,7 @@ class PJFExecutor(object):
         self.logger = self.init_logger()
         self.process = None
         self._out = ""
+        self._err = ""
         self.return_code = 0
         self._in = ""
         self.logger.debug("[{0}] - PJFExecutor successfully initialized".format(time.strftime("%H:%M:%S")))
@@ -55,13 +58,13 @@ class PJFExecutor(object):
         try:
             if type(cmd) != list:
                 raise PJFInvalidType(type(cmd), list)
-            if type(stdin_content) != str:
+            if type(stdin_content) not in [str, list]:
                 raise PJFInvalidType(type(stdin_content), str)
             if type(stdin) != bool:
                 raise PJFInvalidType(type(stdin), bool)
             self._in = stdin_content
             try:
-                self.process = subprocess.Popen(cmd, stdout=PIPE, stderr=PIPE, stdin=PIPE, shell=shell)
+                self.process = subprocess.Popen(cmd, stdout=PIPE, stderr=PIPE, stdin=PIPE, shell=shell, env=self.env)
                 self.finish_read(timeout, stdin_content, stdin)
                 if self.process.poll() is not None:
                     self.close()
@@ -74,17 +77,17 @@ class PJFExecutor(object):
 
     def get_output(self, stdin_content, stdin):
         """
-        Try to get output in a separate thread
+        Try to get output in a separate thread, stdin content may be a string or a list of buffers
         """
         try:
             if stdin:
-                if sys.version_info >= (3, 0):
-                    self.process.stdin.write(bytes(stdin_content, "utf-8"))
-                else:
-                    self.process.stdin.write(stdin_content)
-            self._out = self.process.communicate()[0]
+                if type(stdin_content) != list:
+                    stdin_content = [PJFBuffers.to_bytes(stdin_content)]
+                PJFBuffers.write(self.process.stdin.fileno(), stdin_content)
+            self._out, self._err = self.process.communicate()
         except (error, IOError):
             self._out = self._in
+            self._err = ""
             pass
 
     def finish_read(self, timeout=2, stdin_content="", stdin=False):
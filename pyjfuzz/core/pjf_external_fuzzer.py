@@ -60,10 +60,7 @@ class PJFExternalFuzzer(PJFExecutor):
             else:
                 if "@@" not in self.config.command:
                     raise PJFMissingArgument("Missing @@ filename indicator while using non-stdin fuzzing method")
-                for x in self.config.command:
-                    if "@@" in x:
-                        self.config.command[self.config.command.index(x)] = x.replace("@@", obj)
-                self.spawn(self.config.command, timeout=2)
+                self.spawn([x.replace("@@", obj) for x in self.config.command], timeout=2)
             self.logger.debug("[{0}] - PJFExternalFuzzer successfully completed".format(time.strftime("%H:%M:%S")))
             return self._out
         except KeyboardInterrupt:
@@ -22,17 +22,16 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 from .errors import PJFInvalidType, PJFMissingArgument, PJFBaseException
-from .pjf_mutators import PJFMutators
 from .pjf_mutation import PJFMutation
+from .pjf_mutators import PJFMutators
 from .pjf_encoder import PJFEncoder
+from .pjf_splicer import PJFSplicer
+from .pjf_buffers import PJFBuffers
+from .pjf_stats import PJFStats
+from .pjf_seed import PJFSeed
 from .pjf_logger import PJFLogger
 import time
 import json
-import sys
-if sys.version_info >= (3, 0):
-    import urllib.request, urllib.parse, urllib.error
-else:
-    import urllib
 
 class PJFFactory(object):
 
@@ -47,7 +46,18 @@ class PJFFactory(object):
 
         self.config = configuration
         self.mutator = PJFMutation(self.config)
-        other = self.config.json
+        self.splicer = PJFSplicer(self.config) if self.config.splice else None
+        self.seed = self.config.seed
+        self.worker_id = self.config.worker_id or 0
+        self.iteration = 0
+        self.stats = None
+        self.load(self.config.json)
+        self.logger.debug("[{0}] - PJFFactory successfully initialized".format(time.strftime("%H:%M:%S")))
+
+    def load(self, other):
+        """
+        Load the JSON object used as starting point for the next testcases
+        """
         if not self.config.strong_fuzz:
             if type(other) == dict:
                 self.json = other
@@ -56,17 +66,65 @@ class PJFFactory(object):
             else:
                 raise PJFInvalidType(other, dict)
         else:
-            if self.config.json_file:
+            if self.config.json_file or type(other) not in [list, dict]:
                 self.json = other
             else:
                 self.json = json.dumps(other)
-        self.logger.debug("[{0}] - PJFFactory successfully initialized".format(time.strftime("%H:%M:%S")))
+        self.plan()
+
+    def plan(self):
+        """
+        Find the containers without fuzzable leaves, they are shared with the seed instead of being copied, and the
+        lists made only of leaves, they are mutated at once
+        """
+        self.frozen = set()
+        self.leaves = set()
+        self.fragments = {}
+        if type(self.json) in [dict, list]:
+            self.mutable(self.json)
+
+    def mutable(self, element):
+        """
+        Return True if fuzz_elements would mutate a leaf below element, frozen containers are recorded
+        """
+        mutable = False
+        if type(element) == dict:
+            for key in element:
+                if type(element[key]) in [dict, list]:
+                    mutable = self.mutable(element[key]) or mutable
+                elif self.selected(key):
+                    mutable = True
+        elif type(element) == list:
+            leaves = True
+            for key in element:
+                if type(key) in [dict, list]:
+                    mutable = self.mutable(key) or mutable
+                    leaves = False
+                elif len(self.config.parameters) <= 0:
+                    mutable = True
+            if leaves:
+                self.leaves.add(id(element))
+        if not mutable:
+            self.frozen.add(id(element))
+        return mutable
+
+    def selected(self, key):
+        """
+        Check if the value of a key must be fuzzed according to the parameters
+        """
+        if len(self.config.parameters) > 0:
+            if self.config.exclude_parameters:
+                return key not in self.config.parameters
+            else:
+                return key in self.config.parameters
+        return True
 
     def __add__(self, other):
         """
         Add keys to dictionary merging with another dictionary object
         """
         self.json.update(other)
+        self.plan()
         return self
 
     def __sub__(self, other):
@@ -77,6 +135,7 @@ class PJFFactory(object):
             for element in other:
                 if element in self.json:
                     del self.json[element]
+            self.plan()
             return self
         else:
             raise PJFInvalidType(other, list)
@@ -101,6 +160,7 @@ class PJFFactory(object):
         Set a JSON attribute
         """
         self.json[key] = value
+        self.plan()
 
     def __contains__(self, items):
         """
@@ -131,17 +191,12 @@ class PJFFactory(object):
         Fuzz all elements inside the object
         """
         try:
+            if id(element) in self.frozen:
+                return element
             if type(element) == dict:
                 tmp_element = {}
                 for key in element:
-                    if len(self.config.parameters) > 0:
-                        if self.config.exclude_parameters:
-                            fuzz = key not in self.config.parameters
-                        else:
-                            fuzz = key in self.config.parameters
-                    else:
-                        fuzz = True
-                    if fuzz:
+                    if self.selected(key):
                         if type(element[key]) == dict:
                             tmp_element.update({key: self.fuzz_elements(element[key])})
                         elif type(element[key]) == list:
@@ -153,6 +208,8 @@ class PJFFactory(object):
                 element = tmp_element
                 del tmp_element
             elif type(element) == list:
+                if id(element) in self.leaves and len(self.config.parameters) <= 0:
+                    return self.mutator.mutate_many(element)
                 arr = []
                 for key in element:
                     if type(key) == dict:
@@ -176,32 +233,108 @@ class PJFFactory(object):
         """
         return PJFLogger.init_logger()
 
+    def reseed(self, iteration):
+        """
+        Seed all the mutators for the given iteration, same seed, worker id and iteration give the same testcase
+        """
+        self.mutator.seed(PJFSeed.derive(self.seed, self.worker_id, iteration))
+        # the polyglot pool is shared by every iteration of an epoch, negative iterations keep its seeds apart
+        epoch = iteration // PJFMutators.POOL_EPOCH
+        self.mutator.seed_pool(PJFSeed.derive(self.seed, self.worker_id, -1 - epoch))
+
+    def testcase(self, iteration, worker_id=None, seed=None):
+        """
+        Regenerate the testcase produced at the given iteration without touching the current one
+        """
+        current = (self.iteration, self.worker_id, self.seed)
+        if worker_id is not None:
+            self.worker_id = worker_id
+        if seed is not None:
+            self.seed = seed
+        self.iteration = iteration
+        try:
+            return self.fuzzed
+        finally:
+            self.iteration, self.worker_id, self.seed = current
+
     @property
     def fuzzed(self):
         """
         Get a printable fuzzed object
         """
         try:
+            self.reseed(self.iteration)
+            self.iteration += 1
             if self.config.strong_fuzz:
-                fuzzer = PJFMutators(self.config)
-                if self.config.url_encode:
-                    if sys.version_info >= (3, 0):
-                        return urllib.parse.quote(fuzzer.fuzz(json.dumps(self.config.json)))
-                    else:
-                        return urllib.quote(fuzzer.fuzz(json.dumps(self.config.json)))
+                fuzzer = self.mutator.mutators
+                if type(self.json) in [list, dict]:
+                    document = json.dumps(self.json)
                 else:
-                    if type(self.config.json) in [list, dict]:
-                        return fuzzer.fuzz(json.dumps(self.config.json))
-                    else:
-                        return fuzzer.fuzz(self.config.json)
-            else:
+                    document = self.json
+                start = PJFStats.now() if self.stats else 0
+                result = fuzzer.fuzz(document)
                 if self.config.url_encode:
-                    if sys.version_info >= (3, 0):
-                        return urllib.parse.quote(self.get_fuzzed(self.config.indent, self.config.utf8))
-                    else:
-                        return urllib.quote(self.get_fuzzed(self.config.indent, self.config.utf8))
-                else:
-                    return self.get_fuzzed(self.config.indent, self.config.utf8)
+                    result = PJFEncoder.quote(result)
+                if self.stats:
+                    self.stats.add("testcases")
+                    self.stats.add("generate_ns", PJFStats.now() - start)
+                return result
+            else:
+                return "".join(self.get_fragments(self.config.indent, self.config.utf8, self.config.url_encode))
+        except Exception as e:
+            raise PJFBaseException(e.message if hasattr(e, "message") else str(e))
+
+    def spliced(self):
+        """
+        Return the object to mutate, with subtrees of other documents grafted into it when splicing is enabled
+        """
+        if not self.splicer:
+            return self.json
+        rng = self.mutator.mutators.random
+        if "array" in self.json:
+            return {"array": self.splicer.splice(self.json["array"], rng)}
+        return self.splicer.splice(self.json, rng)
+
+    @property
+    def fuzzed_buffers(self):
+        """
+        Get the fuzzed object as a list of bytes buffers, ready for scatter-gather writes
+        """
+        try:
+            if self.config.strong_fuzz:
+                return [PJFBuffers.to_bytes(self.fuzzed)]
+            self.reseed(self.iteration)
+            self.iteration += 1
+            return PJFBuffers.coalesce(self.get_fragments(self.config.indent, self.config.utf8,
+                                                          self.config.url_encode))
+        except Exception as e:
+            raise PJFBaseException(e.message if hasattr(e, "message") else str(e))
+
+    def fuzzed_object(self):
+        """
+        Return the fuzzed object before its serialization
+        """
+        if "array" in self.json:
+            return self.fuzz_elements(self.spliced())["array"]
+        else:
+            return self.fuzz_elements(self.spliced())
+
+    def get_fragments(self, indent=False, utf8=False, url_encode=False):
+        """
+        Return the fuzzed object as a list of printable fragments, unchanged subtrees come from the cache
+        """
+        try:
+            if not self.stats:
+                return PJFEncoder.fragments(self.fuzzed_object(), indent, utf8, self.frozen, self.fragments,
+                                            url_encode)
+            start = PJFStats.now()
+            obj = self.fuzzed_object()
+            middle = PJFStats.now()
+            fragments = PJFEncoder.fragments(obj, indent, utf8, self.frozen, self.fragments, url_encode)
+            self.stats.add("testcases")
+            self.stats.add("generate_ns", middle - start)
+            self.stats.add("encode_ns", PJFStats.now() - middle)
+            return fragments
         except Exception as e:
             raise PJFBaseException(e.message if hasattr(e, "message") else str(e))
 
@@ -211,9 +344,6 @@ class PJFFactory(object):
         Return the fuzzed object
         """
         try:
-            if "array" in self.json:
-                return self.fuzz_elements(dict(self.json))["array"]
-            else:
-                return self.fuzz_elements(dict(self.json))
+            return self.fuzzed_object()
         except Exception as e:
             raise PJFBaseException(e.message if hasattr(e, "message") else str(e))
@@ -25,13 +25,57 @@ SOFTWARE.
 from gramfuzz import *
 import json
 
-def generate_json(path):
+
+def size_limits(size):
+    # with a size range the size budget bounds the output instead of the recursion
+    # limit, which is raised so that larger documents can be reached at all
+    if not size:
+        return None, None, 10
+    return size[0], size[1], 30
+
+
+def generate_json(path, seed=None, size=None):
+    if seed is not None:
+        from gramfuzz import rand
+        rand.seed(seed)
+    min_size, max_size, max_recursion = size_limits(size)
     grammar = GramFuzzer()
     grammar.load_grammar(path)
-    for x in grammar.gen(cat="json", num=10, max_recursion=10):
+    for x in grammar.gen(cat="json", num=10, max_recursion=max_recursion, min_size=min_size, max_size=max_size):
             if x not in ["{}", "[]"]:
                 j = json.loads(x)
                 del grammar
                 return j
     return {"dummy": 1}
 
+
+def generate_corpus(path, num=16, seed=None, mutations=4, size=None):
+    # only one document out of "mutations" is generated from scratch, the others are
+    # derived from them by regenerating random subtrees of their derivation
+    from gramfuzz import rand
+    if seed is not None:
+        rand.seed(seed)
+    min_size, max_size, max_recursion = size_limits(size)
+    grammar = GramFuzzer()
+    grammar.load_grammar(path)
+    derivations = []
+    grammar.gen(cat="json", num=max(1, num // mutations), max_recursion=max_recursion, derivations=derivations,
+                min_size=min_size, max_size=max_size)
+    corpus = []
+    seen = set()
+    attempts = 0
+    while len(corpus) < num and attempts < num * mutations and len(derivations) > 0:
+        if attempts < len(derivations):
+            x = derivations[attempts].text
+        else:
+            x = grammar.mutate(rand.choice(derivations), max_size=max_size).text
+        attempts += 1
+        if min_size is not None and len(x) < min_size:
+            continue
+        if x not in ["{}", "[]"] and x not in seen:
+            seen.add(x)
+            corpus.append(json.loads(x))
+    del grammar
+    if len(corpus) == 0:
+        corpus.append({"dummy": 1})
+    return corpus
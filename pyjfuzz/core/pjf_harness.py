@@ -0,0 +1,190 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from .errors import PJFMissingArgument, PJFBaseException, PJFTimeoutError
+from .pjf_configuration import PJFConfiguration
+from .pjf_factory import PJFFactory
+from .pjf_logger import PJFLogger
+from argparse import Namespace
+import multiprocessing
+import traceback
+import hashlib
+import signal
+import time
+import sys
+
+
+class PJFHarness(object):
+    """
+    In-process harness, feeds PJFFactory testcases straight into a python callable
+    """
+
+    def __init__(self, configuration, target):
+        """
+        Init the harness with the configuration used by PJFFactory and the callable to fuzz
+        """
+        self.logger = self.init_logger()
+        if ["json"] not in configuration:
+            raise PJFMissingArgument("PJFHarness needs \"json\" argument inside config object")
+        if not callable(target):
+            raise PJFMissingArgument("PJFHarness needs a callable target")
+        self.config = configuration
+        self.target = target
+        self.findings = {}
+        self.logger.debug("[{0}] - PJFHarness successfully initialized".format(time.strftime("%H:%M:%S")))
+
+    def run(self, iterations, jobs=1, timeout=None, memory=None):
+        """
+        Run the given number of iterations across jobs processes, return the findings bucketed by traceback.
+        timeout is expressed in seconds per call, memory is the address space limit in bytes
+        """
+        try:
+            base = self.config.worker_id * jobs
+            tasks = []
+            for job in range(0, jobs):
+                count = iterations // jobs + (1 if job < iterations % jobs else 0)
+                tasks.append((self.target, self.config, base + job, count, timeout, memory))
+            if jobs <= 1:
+                results = [_run_job(task) for task in tasks]
+            else:
+                pool = multiprocessing.Pool(jobs)
+                try:
+                    results = pool.map(_run_job, tasks)
+                finally:
+                    pool.close()
+                    pool.join()
+            for findings in results:
+                self.merge(findings)
+            return self.findings
+        except Exception as e:
+            raise PJFBaseException(e.message if hasattr(e, "message") else str(e))
+
+    def run_job(self, worker_id, iterations, timeout=None, memory=None):
+        """
+        Run iterations testcases inside the current process
+        """
+        factory = PJFFactory(self.config)
+        factory.worker_id = worker_id
+        findings = {}
+        limits = self.set_limits(timeout, memory)
+        try:
+            for _ in range(0, iterations):
+                testcase = factory.fuzzed
+                try:
+                    if limits["timeout"]:
+                        signal.setitimer(signal.ITIMER_REAL, timeout)
+                    try:
+                        self.target(testcase)
+                    finally:
+                        if limits["timeout"]:
+                            signal.setitimer(signal.ITIMER_REAL, 0)
+                except (Exception, MemoryError):
+                    bucket, info = self.bucket(sys.exc_info())
+                    if bucket not in findings:
+                        info.update({"count": 0, "testcase": testcase, "seed": factory.seed, "worker": worker_id,
+                                     "iteration": factory.iteration - 1})
+                        findings[bucket] = info
+                    findings[bucket]["count"] += 1
+        finally:
+            self.restore_limits(limits)
+        return findings
+
+    def bucket(self, exc_info):
+        """
+        Return the bucket of an exception, exceptions raised by the same code path share the bucket
+        """
+        exc_type, exc_value, tb = exc_info
+        if exc_type is PJFTimeoutError:
+            # hangs are interrupted at random places, keep them all together
+            return "timeout", {"exception": "Timeout", "traceback": ""}
+        frames = traceback.extract_tb(tb)[1:]
+        key = "|".join([exc_type.__name__] + ["{0}:{1}:{2}".format(f[0], f[1], f[2]) for f in frames])
+        info = {
+            "exception": "{0}: {1}".format(exc_type.__name__, exc_value),
+            "traceback": "".join(traceback.format_exception(exc_type, exc_value, tb)),
+        }
+        return hashlib.sha1(key.encode("utf-8")).hexdigest(), info
+
+    def merge(self, findings):
+        """
+        Merge findings coming from a job, the first testcase of each bucket is kept
+        """
+        for bucket in findings:
+            if bucket not in self.findings:
+                self.findings[bucket] = findings[bucket]
+            else:
+                self.findings[bucket]["count"] += findings[bucket]["count"]
+
+    def set_limits(self, timeout, memory):
+        """
+        Install the per call timeout and the memory limit, return what is needed to restore them
+        """
+        limits = {"timeout": False, "handler": None, "memory": None}
+        if timeout:
+            try:
+                limits["handler"] = signal.signal(signal.SIGALRM, _raise_timeout)
+                limits["timeout"] = True
+            except (ValueError, AttributeError):
+                # signals are only available inside the main thread of a posix process
+                self.logger.debug("[{0}] - PJFHarness timeout not available".format(time.strftime("%H:%M:%S")))
+        if memory:
+            import resource
+            limits["memory"] = resource.getrlimit(resource.RLIMIT_AS)
+            resource.setrlimit(resource.RLIMIT_AS, (memory, limits["memory"][1]))
+        return limits
+
+    def restore_limits(self, limits):
+        """
+        Restore the limits changed by set_limits
+        """
+        if limits["timeout"]:
+            signal.signal(signal.SIGALRM, limits["handler"])
+        if limits["memory"]:
+            import resource
+            resource.setrlimit(resource.RLIMIT_AS, limits["memory"])
+
+    def init_logger(self):
+        """
+        Init the default logger
+        """
+        return PJFLogger.init_logger()
+
+
+def _raise_timeout(*args):
+    raise PJFTimeoutError("Call timed out")
+
+
+def _run_job(task):
+    target, configuration, worker_id, iterations, timeout, memory = task
+    return PJFHarness(configuration, target).run_job(worker_id, iterations, timeout, memory)
+
+
+def fuzz_function(target, seed_json, iterations=1000, jobs=1, timeout=None, memory=None, **options):
+    """
+    Fuzz a python callable with testcases generated from seed_json, return the findings bucketed by traceback.
+    Any PJFConfiguration option (level, techniques, seed, ...) may be passed as keyword argument
+    """
+    options.setdefault("level", 6)
+    options.setdefault("nologo", True)
+    config = PJFConfiguration(Namespace(json=seed_json, **options))
+    return PJFHarness(config, target).run(iterations, jobs=jobs, timeout=timeout, memory=memory)
@@ -2,9 +2,13 @@ from gramfuzz.fields import  *
 
 TOP_CAT = "json"
 
-class RDef(Def): cat="json-def"
+class RDef(Def):
+    __slots__ = ()
+    cat = "json-def"
 
-class RRef(Ref): cat="json-def"
+class RRef(Ref):
+    __slots__ = ()
+    cat = "json-def"
 
 Def("json",
     RRef("json-object") | RRef("json-array"),
@@ -22,6 +22,10 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 from .pjf_decoretors import PJFDecorators
+import sys
+
+if sys.version_info >= (3, 0):
+    unicode = str
 
 class PJFMutation(object):
     """
@@ -31,14 +35,70 @@ class PJFMutation(object):
     def __init__(self, configuration):
         self.config = configuration
         self.decorators = PJFDecorators(self.config)
+        self.mutators = self.decorators.Mutators
+        # type -> function mutating a value of that type, resolved the first time the type is seen
+        self.dispatch = {}
+
+    def seed(self, value):
+        """
+        Seed the mutators used by this mutation object
+        """
+        self.mutators.seed(value)
+
+    def seed_pool(self, value):
+        """
+        Seed the pool of fuzzed polyglot attacks used by the string mutators
+        """
+        self.mutators.seed_pool(value)
 
     def fuzz(self, obj):
         """
-        Generic fuzz mutator, use a decorator for the given type
+        Generic fuzz mutator, same result as PJFDecorators.mutate_object_decorate through the dispatch table
         """
-        decorators = self.decorators
+        mutate = self.dispatch.get(type(obj))
+        if mutate is None:
+            mutate = self.resolve(type(obj))
+        return mutate(obj)
+
+    def mutate_many(self, values):
+        """
+        Mutate every value of a list of leaves, large numeric lists are mutated at once with numpy if available
+        """
+        fuzzed = self.mutators.fuzz_numbers(values)
+        if fuzzed is not None:
+            return fuzzed
+        dispatch = self.dispatch
+        resolve = self.resolve
+        result = []
+        for obj in values:
+            mutate = dispatch.get(type(obj))
+            if mutate is None:
+                mutate = resolve(type(obj))
+            result.append(mutate(obj))
+        return result
+
+    def resolve(self, obj_type):
+        """
+        Build and cache the function mutating values of the given type
+        """
+        mutators = self.mutators
+        if obj_type == unicode and obj_type != str:
+            get_random = mutators._get_random
+
+            def mutate(obj):
+                return get_random(str)(str(obj))
+        elif self.config.adaptive or (mutators.dictionary and obj_type == str) or obj_type not in mutators.mutator:
+            # the scheduler and the dictionary token need the generic candidates, unknown types raise from there
+            get_random = mutators._get_random
+
+            def mutate(obj):
+                return get_random(obj_type)(obj)
+        else:
+            table = mutators.mutator[obj_type]
+            level = self.config.level
 
-        @decorators.mutate_object_decorate
-        def mutate():
-            return obj
-        return mutate()
+            def mutate(obj):
+                # mutators.random is looked up on every call, the polyglot pool swaps it while filled
+                return table[mutators.random.randint(0, level)](obj)
+        self.dispatch[obj_type] = mutate
+        return mutate
@@ -21,13 +21,21 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
+from .pjf_scheduler import PJFScheduler
+from .pjf_dictionary import PJFDictionary
 import random
 import string
 import re
 import struct
 import math
+import time
 import sys
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 if sys.version_info >= (3, 0):
     long = int
     unicode = str
@@ -38,18 +46,44 @@ class PJFMutators(object):
     Class that represent all the available mutators based on type
     """
 
+    # number of fuzzed variants of each polyglot attack kept in the pool
+    POOL_SIZE = 16
+    # number of iterations sharing the same pool before it is rebuilt
+    POOL_EPOCH = 1024
+    # stands for the original string while a pooled polyglot attack is fuzzed
+    POOL_MARKER = u"\ue000"
+    # at most 2^HAVOC_STACK stacked havoc actions per fuzzed object (unless --havoc-stack is given)
+    HAVOC_STACK = 7
+    # stop stacking havoc actions once the object grew this many times its original size
+    HAVOC_MAX_GROWTH = 4
+    # lists of numbers at least this long are mutated with numpy when it is installed
+    NUMPY_THRESHOLD = 256
+    # larger numbers are left to the python mutators, the vectorized ones would overflow or lose precision
+    NUMPY_LIMIT = 1 << 52
+
     def __init__(self, configuration):
         self.random_chars = string.printable[:-5]
         self.config = configuration
+        self.random = random.Random()
+        self.scheduler = PJFScheduler(configuration) if configuration.adaptive else None
+        self.actions = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+        self.dictionary = PJFDictionary(configuration) if configuration.dictionary else None
+        if self.dictionary:
+            self.actions.append(11)
         self.json_fuzzer = self.fuzz
+        self.havoc_stack = configuration.havoc_stack or self.HAVOC_STACK
+        self.havoc_time = configuration.havoc_time or 0
+        self.pool_seed = None
+        self.polyglot_pool = {}
         self.string_mutator = {
             0: lambda x: False,
-            1: lambda x: self.json_fuzzer(self.get_string_polyglot_attack(x)),
+            1: lambda x: self.get_fuzzed_polyglot_attack(x),
             2: lambda x: "",
             3: lambda x: [x],
             4: lambda x: [{str(x): str(x)}],
-            5: lambda x: {"param": self.json_fuzzer(self.get_string_polyglot_attack(x))},
+            5: lambda x: {"param": self.get_fuzzed_polyglot_attack(x)},
             6: lambda x: 0,
+            7: lambda x: self.splice_token(x),
         }
 
         self.boolean_mutator = {
@@ -67,7 +101,7 @@ class PJFMutators(object):
             1: lambda x: -x,
             2: lambda x: "%s" % x,
             3: lambda x: x | 0xff,
-            4: lambda x: random.randint(-2147483647, 2147483647),
+            4: lambda x: self.random.randint(-2147483647, 2147483647),
             5: lambda x: bool(x),
             6: lambda x: x | 0xff000000
         }
@@ -77,7 +111,7 @@ class PJFMutators(object):
             1: lambda x: -x,
             2: lambda x: "%s" % x,
             3: lambda x: float(int(round(x, 0)) | 0xff),
-            4: lambda x: float(random.randint(-2147483647, 2147483647)*0.1),
+            4: lambda x: float(self.random.randint(-2147483647, 2147483647)*0.1),
             5: lambda x: bool(round(x, 0)),
             6: lambda x: float(int(round(x, 0)) | 0xff000000)
         }
@@ -101,6 +135,15 @@ class PJFMutators(object):
             type(None): self.null_mutator,
         }
 
+        self.mutator_names = {
+            str: "string",
+            bool: "boolean",
+            int: "int",
+            float: "float",
+            long: "int",
+            type(None): "null",
+        }
+
         self.polyglot_attacks = {
             0: "jaVasCript:/*-/*\x60/*\x60/*'/*\"/**/(/* */oNcliCk=alert() )//%%0D%%0A%%0d%%0a//</stYle/</tit"
                "Le/</teXtarEa/</scRipt/--!>\x3csVg/<sVg/oNloAd=alert(\%s\)//>\x3e",
@@ -120,15 +163,55 @@ class PJFMutators(object):
             11: "${7*7}a{{%s}}b",
             12: "{{'%s'*7}}",
             13: "#{%%x['%s']}+foo",
-            14: "".join(self.random_chars[random.randint(0, 94)]
-                        for _ in range(0, random.randint(1, 30))).replace("%", "%%") + "%s"
+            14: self.get_random_polyglot_attack()
         }
 
+    def seed(self, value):
+        """
+        Seed the random generator used by all the mutators, the random polyglot attack is rebuilt accordingly
+        """
+        self.random.seed(value)
+        self.polyglot_attacks[14] = self.get_random_polyglot_attack()
+
+    def seed_pool(self, value):
+        """
+        Seed the pool of fuzzed polyglot attacks, the pool is emptied (and lazily rebuilt) when the seed changes
+        """
+        if value != self.pool_seed:
+            self.pool_seed = value
+            self.polyglot_pool = {}
+
+    def get_random_polyglot_attack(self):
+        """
+        Return a polyglot attack made of random printable characters
+        """
+        return "".join(self.random_chars[self.random.randint(0, 94)]
+                       for _ in range(0, self.random.randint(1, 30))).replace("%", "%%") + "%s"
+
     def _get_random(self, obj_type):
         """
         Get a random mutator from a list of mutators
         """
-        return self.mutator[obj_type][random.randint(0, self.config.level)]
+        candidates = list(range(0, self.config.level + 1))
+        if self.dictionary and obj_type == str:
+            candidates.append(7)
+        if self.scheduler:
+            index = self.scheduler.choice(self.random, self.mutator_names[obj_type], candidates)
+        elif len(candidates) > self.config.level + 1:
+            index = self.random.choice(candidates)
+        else:
+            index = self.random.randint(0, self.config.level)
+        return self.mutator[obj_type][index]
+
+    def splice_token(self, obj):
+        """
+        Replace the string with a dictionary token or insert a token inside it
+        """
+        token = self.dictionary.choice(self.random)
+        if not obj or self.random.randint(0, 1) == 0:
+            return token
+        pos = self.random.randint(0, len(obj))
+        return obj[:pos] + token + obj[pos:]
 
     def get_mutator(self, obj, obj_type):
         """
@@ -139,42 +222,135 @@ class PJFMutators(object):
             obj = str(obj)
         return self._get_random(obj_type)(obj)
 
+    def fuzz_numbers(self, values):
+        """
+        Mutate a list of int or a list of float with numpy, the int / float mutators are applied as vectorized
+        operations over the whole list. Return None if the list must be mutated element by element
+        """
+        if numpy is None or self.scheduler or len(values) < self.NUMPY_THRESHOLD:
+            return None
+        types = set(map(type, values))
+        if types <= set([int, long]):
+            try:
+                arr = numpy.array(values, dtype=numpy.int64)
+            except OverflowError:
+                return None
+            rounded = arr
+        elif types == set([float]):
+            arr = numpy.array(values, dtype=numpy.float64)
+            if not numpy.isfinite(arr).all():
+                # int(round(x, 0)) raises on nan and inf, keep the same behavior
+                return None
+            rounded = numpy.round(arr)
+        else:
+            return None
+        if len(arr) == 0 or numpy.abs(rounded).max() >= self.NUMPY_LIMIT:
+            return None
+        rounded = rounded.astype(numpy.int64)
+        rng = numpy.random.RandomState(self.random.getrandbits(32))
+        index = rng.randint(0, self.config.level + 1, size=len(arr))
+        random_ints = rng.randint(-2147483647, 2147483648, size=len(arr)).astype(numpy.int64)
+        if arr.dtype == numpy.int64:
+            choices = [arr ^ 0xffffff, -arr, arr, arr | 0xff, random_ints, arr, arr | 0xff000000]
+        else:
+            choices = [(rounded ^ 0xffffff).astype(numpy.float64), -arr, arr,
+                       (rounded | 0xff).astype(numpy.float64), random_ints * 0.1, arr,
+                       (rounded | 0xff000000).astype(numpy.float64)]
+        result = numpy.select([index == i for i in range(len(choices))], choices).astype(object)
+        strings = index == 2
+        if strings.any():
+            result[strings] = ["%s" % x for x in arr[strings].tolist()]
+        booleans = index == 5
+        if booleans.any():
+            result[booleans] = (rounded[booleans] != 0).tolist()
+        return result.tolist()
+
     def get_string_polyglot_attack(self, obj):
         """
         Return a polyglot attack containing the original object
         """
-        return self.polyglot_attacks[random.choice(self.config.techniques)] % obj
+        return self.polyglot_attacks[self.random.choice(self.config.techniques)] % obj
+
+    def get_fuzzed_polyglot_attack(self, obj):
+        """
+        Return a fuzzed polyglot attack containing the original object, taken from the pool once it is seeded
+        """
+        if self.pool_seed is None:
+            return self.json_fuzzer(self.get_string_polyglot_attack(obj))
+        attack = self.random.choice(self.config.techniques)
+        if attack not in self.polyglot_pool:
+            self.polyglot_pool[attack] = self.fill_pool(attack)
+        pool = self.polyglot_pool[attack]
+        fmt, count = pool[self.random.randrange(len(pool))]
+        return fmt % ((obj,) * count)
+
+    def fill_pool(self, attack):
+        """
+        Fuzz POOL_SIZE variants of a polyglot attack, the original object is left as a placeholder. The variants only
+        depend on the pool seed and the attack, so testcases stay reproducible whatever order the pool is filled in
+        """
+        rng, scheduler = self.random, self.scheduler
+        self.random = random.Random("{0}:{1}".format(self.pool_seed, attack))
+        # pooled variants are shared by many testcases, keep them out of the adaptive statistics
+        self.scheduler = None
+        try:
+            pool = []
+            for _ in range(self.POOL_SIZE):
+                if attack == 14:
+                    template = self.get_random_polyglot_attack()
+                else:
+                    template = self.polyglot_attacks[attack]
+                fuzzed = self.json_fuzzer(template % self.POOL_MARKER)
+                pool.append((fuzzed.replace("%", "%%").replace(self.POOL_MARKER, "%s"),
+                             fuzzed.count(self.POOL_MARKER)))
+            return pool
+        finally:
+            self.random, self.scheduler = rng, scheduler
 
     def fuzz(self, obj):
         """
         Perform the fuzzing
         """
         buf = list(obj)
-        FuzzFactor = random.randrange(1, len(buf))
-        numwrites=random.randrange(math.ceil((float(len(buf)) / FuzzFactor)))+1
+        if len(buf) < 2:
+            return self.safe_unicode(buf)
+        FuzzFactor = self.random.randrange(1, len(buf))
+        numwrites=self.random.randrange(math.ceil((float(len(buf)) / FuzzFactor)))+1
+        # AFL-like stacking, the number of actions no longer grows with the size of the object
+        numwrites = min(numwrites, 1 << self.random.randint(1, self.havoc_stack))
+        max_size = len(buf) * self.HAVOC_MAX_GROWTH
+        deadline = time.time() + self.havoc_time / 1000.0 if self.havoc_time else None
         for j in range(numwrites):
             self.random_action(buf)
+            if len(buf) > max_size:
+                break
+            # the time budget makes the testcase depend on the machine, it is disabled unless --havoc-time is given
+            if deadline is not None and time.time() >= deadline:
+                break
         return self.safe_unicode(buf)
 
     def random_action(self, b):
         """
         Perform the actual fuzzing using random strategies
         """
-        action = random.choice([1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
+        if self.scheduler:
+            action = self.scheduler.choice(self.random, "havoc", self.actions)
+        else:
+            action = self.random.choice(self.actions)
         if len(b) >= 3:
-            pos = random.randint(0, len(b)-2)
+            pos = self.random.randint(0, len(b)-2)
             if action == 1:
-                rbyte = random.randrange(256)
-                rn = random.randrange(len(b))
+                rbyte = self.random.randrange(256)
+                rn = self.random.randrange(len(b))
                 b[rn] = "%c" % rbyte
             elif action == 2:
-                howmany = random.randint(1, 100)
+                howmany = self.random.randint(1, 100)
                 curpos = pos
                 for _ in range(0, howmany):
                     b.insert(curpos, b[pos])
                     pos += 1
             elif action == 3:
-                n = random.choice([1, 2, 4])
+                n = self.random.choice([1, 2, 4])
                 for _ in range(0, n):
                     if len(b) > pos+1:
                         tmp = b[pos]
@@ -192,7 +368,7 @@ class PJFMutators(object):
                     4: lambda x, y: ord(x) << y,
                     5: lambda x, y: ord(x) >> y,
                 }
-                n = random.choice([1, 2, 4])
+                n = self.random.choice([1, 2, 4])
                 if len(b) < pos+n:
                     pos = len(b) - (pos+n)
                 if n == 1:
@@ -211,11 +387,11 @@ class PJFMutators(object):
                     b[pos] = v
                     pos += 1
             elif action == 6:
-                b.insert(random.randint(0, len(b)-1), random.choice(["\"", "[", "]", "+", "-", "}", "{"]))
+                b.insert(self.random.randint(0, len(b)-1), self.random.choice(["\"", "[", "]", "+", "-", "}", "{"]))
             elif action == 7:
-                del b[random.randint(0, len(b)-1)]
+                del b[self.random.randint(0, len(b)-1)]
             elif action in [8, 9]:
-                block = random.choice([
+                block = self.random.choice([
                     (r"\"", r"\""),
                     (r"\[", r"\]"),
                     (r"\{", r"\}")
@@ -223,18 +399,18 @@ class PJFMutators(object):
                 b_str = self.safe_join(b)
                 block_re = re.compile(str(".+({0}[^{2}{3}]+{1}).+").format(block[0], block[1], block[0], block[1]))
                 if block_re.search(b_str):
-                    r = random.choice(block_re.findall(b_str))
+                    r = self.random.choice(block_re.findall(b_str))
                     random_re = re.compile("({0})".format(re.escape(r)))
                     if random_re.search(b_str):
                         if action == 8:
                             newarr = list(random_re.sub("", b_str))
                             b[:] = newarr
                         else:
-                            newarr = list(random_re.sub("\\1" * random.randint(1, 10), b_str, 1))
+                            newarr = list(random_re.sub("\\1" * self.random.randint(1, 10), b_str, 1))
                             b[:] = newarr
             elif action == 10:
                 b_str = self.safe_join(b)
-                limit_choice = random.choice([
+                limit_choice = self.random.choice([
                     0x7FFFFFFF,
                     -0x80000000,
                     0xff,
@@ -242,10 +418,18 @@ class PJFMutators(object):
                 ])
                 block_re = re.compile("(\-?[0-9]+)")
                 if block_re.search(b_str):
-                    block = random.choice([m for m in block_re.finditer(b_str)])
+                    block = self.random.choice([m for m in block_re.finditer(b_str)])
                     new = b_str[0:block.start()] + str(int(block.group())*limit_choice) + b_str[block.start() +
                                                                                                 len(block.group()):]
                     b[:] = list(new)
+            elif action == 11:
+                boundaries = [i for i, c in enumerate(b) if c in "{}[],:\""]
+                pos = self.random.choice(boundaries) + 1 if boundaries else pos
+                token = list(self.dictionary.choice(self.random))
+                if self.random.randint(0, 1) == 0:
+                    b[pos:pos] = token
+                else:
+                    b[pos:pos + len(token)] = token
 
     def safe_join(self, buf):
         """
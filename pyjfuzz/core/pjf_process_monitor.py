@@ -29,6 +29,7 @@ import shlex
 from subprocess import PIPE
 from .pjf_executor import PJFExecutor
 from .pjf_testcase_server import PJFTestcaseServer
+from .pjf_factory import PJFFactory
 from .errors import PJFMissingArgument ,PJFBaseException, PJFProcessExecutionError
 
 class PJFProcessMonitor(PJFTestcaseServer, PJFExecutor):
@@ -45,6 +46,7 @@ class PJFProcessMonitor(PJFTestcaseServer, PJFExecutor):
         self.process = None
         self.finished = False
         self.testcase_count = 0
+        self.factory = None
         if self.config.debug:
             print("[\033[92mINFO\033[0m] Starting process monitoring...")
             print("[\033[92mINFO\033[0m] Starting Testcase Server ({0})...".format(
@@ -83,6 +85,10 @@ class PJFProcessMonitor(PJFTestcaseServer, PJFExecutor):
             except OSError:
                 pass
             for test in testcase:
+                if type(test) == tuple:
+                    test = self.regenerate_testcase(*test)
+                if not isinstance(test, bytes):
+                    test = test.encode("utf-8")
                 with open("{0}/testcase_{1}.json".format(dir_name, self.testcase_count), "wb") as t:
                     t.write(test)
                     t.close()
@@ -90,6 +96,14 @@ class PJFProcessMonitor(PJFTestcaseServer, PJFExecutor):
         except Exception as e:
             raise PJFBaseException(e.message if hasattr(e, "message") else str(e))
 
+    def regenerate_testcase(self, seed, worker_id, iteration):
+        """
+        Regenerate a testcase notified by index, the JSON object must be the same one used by the server
+        """
+        if self.factory is None:
+            self.factory = PJFFactory(self.config)
+        return self.factory.testcase(iteration, worker_id=worker_id, seed=seed)
+
     def run_and_monitor(self):
         """
         Run command once and check exit code
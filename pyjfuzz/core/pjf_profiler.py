@@ -0,0 +1,243 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from .pjf_logger import PJFLogger
+from .pjf_stats import PJFStats
+import importlib
+import inspect
+import atexit
+import signal
+import json
+import time
+import os
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+
+class PJFProfiler(object):
+    """
+    Opt-in instrumentation of the testcase pipeline, every call is timed and aggregated into log2 histograms
+    """
+
+    # (module, class, method) wrapped with a span
+    TARGETS = [
+        ("pjf_mutation", "PJFMutation", "fuzz"),
+        ("pjf_mutation", "PJFMutation", "mutate_many"),
+        ("pjf_factory", "PJFFactory", "fuzz_elements"),
+        ("pjf_encoder", "PJFEncoder", "fragments"),
+        ("pjf_executor", "PJFExecutor", "spawn"),
+        ("pjf_server", "PJFServer", "serve"),
+    ]
+    # number of entries reported from cProfile and tracemalloc
+    TOP = 30
+    # the installed profiler, forked processes that do not exit through atexit dump it themselves
+    active = None
+
+    def __init__(self, configuration=None):
+        """
+        Init the profiler, profile_sample enables cProfile on one call every N and profile_memory enables tracemalloc
+        """
+        self.logger = self.init_logger()
+        self.config = configuration
+        self.sample = (configuration.profile_sample if configuration else 0) or 0
+        self.memory = configuration.profile_memory if configuration else False
+        self.spans = {}
+        self.depth = {}
+        self.calls = 0
+        self.profile = None
+        self.profiling = False
+        self.patched = []
+        self.handler = signal.SIG_DFL
+        self.logger.debug("[{0}] - PJFProfiler successfully initialized".format(time.strftime("%H:%M:%S")))
+
+    def install(self):
+        """
+        Wrap the pipeline methods and dump the results on exit or on SIGUSR1
+        """
+        for module_name, class_name, method in self.TARGETS:
+            try:
+                module = importlib.import_module(".{0}".format(module_name), __package__)
+            except ImportError:
+                # PJFServer needs bottle
+                continue
+            cls = getattr(module, class_name)
+            original = cls.__dict__[method]
+            name = "{0}.{1}".format(class_name, method)
+            if isinstance(original, staticmethod):
+                setattr(cls, method, staticmethod(self.wrap(name, original.__func__)))
+            else:
+                setattr(cls, method, self.wrap(name, original))
+            self.patched.append((cls, method, original))
+        if self.sample:
+            import cProfile
+            self.profile = cProfile.Profile()
+        if self.memory:
+            import tracemalloc
+            tracemalloc.start()
+        atexit.register(self.dump)
+        if hasattr(signal, "SIGUSR1"):
+            self.handler = signal.signal(signal.SIGUSR1, lambda *args: self.dump())
+        PJFProfiler.active = self
+        return self
+
+    def uninstall(self):
+        """
+        Restore the original methods
+        """
+        for cls, method, original in self.patched:
+            setattr(cls, method, original)
+        self.patched = []
+        if hasattr(atexit, "unregister"):
+            atexit.unregister(self.dump)
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, self.handler)
+        if PJFProfiler.active is self:
+            PJFProfiler.active = None
+        if self.memory:
+            import tracemalloc
+            tracemalloc.stop()
+
+    def wrap(self, name, func):
+        """
+        Return func wrapped with a span, generators are timed until exhausted
+        """
+        profiler = self
+        self.spans[name] = {"count": 0, "total": 0, "min": None, "max": 0, "histogram": [0] * 64}
+        self.depth[name] = 0
+        if inspect.isgeneratorfunction(func):
+            def generator_wrapper(*args, **kwargs):
+                start = profiler.enter(name)
+                try:
+                    for item in func(*args, **kwargs):
+                        yield item
+                finally:
+                    profiler.leave(name, start)
+            return generator_wrapper
+
+        def wrapper(*args, **kwargs):
+            start = profiler.enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.leave(name, start)
+        return wrapper
+
+    def enter(self, name):
+        """
+        Open a span, only the outermost call of recursive methods is measured
+        """
+        self.depth[name] += 1
+        if self.depth[name] > 1:
+            return None
+        if self.profile is not None and not self.profiling:
+            self.calls += 1
+            if self.calls % self.sample == 0:
+                self.profiling = name
+                self.profile.enable()
+        return PJFStats.now()
+
+    def leave(self, name, start):
+        """
+        Close a span and add its duration to the histogram
+        """
+        self.depth[name] -= 1
+        if start is None:
+            return
+        elapsed = PJFStats.now() - start
+        if self.profiling == name:
+            self.profile.disable()
+            self.profiling = False
+        span = self.spans[name]
+        span["count"] += 1
+        span["total"] += elapsed
+        span["max"] = max(span["max"], elapsed)
+        span["min"] = elapsed if span["min"] is None else min(span["min"], elapsed)
+        span["histogram"][min(int(elapsed).bit_length(), 63)] += 1
+
+    @staticmethod
+    def percentile(span, value):
+        """
+        Upper bound in microseconds of the histogram bucket containing the given percentile
+        """
+        target = span["count"] * value
+        seen = 0
+        for bucket, count in enumerate(span["histogram"]):
+            seen += count
+            if count and seen >= target:
+                return round((1 << bucket) / 1e3, 3)
+        return 0
+
+    def report(self):
+        """
+        Return the collected spans, cProfile and tracemalloc results as a dictionary
+        """
+        report = {"pid": os.getpid(), "spans": {}}
+        for name, span in self.spans.items():
+            if not span["count"]:
+                continue
+            report["spans"][name] = {
+                "count": span["count"],
+                "total_ms": round(span["total"] / 1e6, 3),
+                "avg_us": round(span["total"] / span["count"] / 1e3, 3),
+                "min_us": round(span["min"] / 1e3, 3),
+                "max_us": round(span["max"] / 1e3, 3),
+                "p50_us": self.percentile(span, 0.5),
+                "p90_us": self.percentile(span, 0.9),
+                "p99_us": self.percentile(span, 0.99),
+                "histogram": dict(("<{0}us".format(round((1 << b) / 1e3, 3)), c)
+                                  for b, c in enumerate(span["histogram"]) if c)
+            }
+        if self.profile is not None:
+            import pstats
+            stream = StringIO()
+            try:
+                pstats.Stats(self.profile, stream=stream).sort_stats("cumulative").print_stats(self.TOP)
+                report["cprofile"] = stream.getvalue().splitlines()
+            except TypeError:
+                # nothing sampled yet
+                report["cprofile"] = []
+        if self.memory:
+            import tracemalloc
+            if tracemalloc.is_tracing():
+                statistics = tracemalloc.take_snapshot().statistics("lineno")
+                report["tracemalloc"] = [str(stat) for stat in statistics[:self.TOP]]
+        return report
+
+    def dump(self, path=None):
+        """
+        Write the report to path, by default pjf_profile_<pid>.json inside the current directory
+        """
+        path = path or "pjf_profile_{0}.json".format(os.getpid())
+        with open(path, "w") as output:
+            output.write(json.dumps(self.report(), indent=4, sort_keys=True))
+            output.close()
+        return path
+
+    def init_logger(self):
+        """
+        Init the default logger
+        """
+        return PJFLogger.init_logger()
@@ -0,0 +1,151 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from .pjf_logger import PJFLogger
+import hashlib
+import time
+import re
+
+
+class PJFScheduler(object):
+    """
+    Adaptive operator scheduler, selection probabilities follow the yield of each mutator
+    """
+
+    # number of rewarded testcases between two probability updates
+    PERIOD = 100
+    # minimum probability share granted to every operator so that none of them starves
+    MIN_SHARE = 0.05
+    # a crash is worth more than a new edge or a new parser error
+    CRASH_REWARD = 10
+
+    def __init__(self, configuration=None):
+        """
+        Init the scheduler, every operator starts with the same probability
+        """
+        self.logger = self.init_logger()
+        self.config = configuration
+        self.operators = {}
+        self.weights = {}
+        self.errors = set()
+        self.used = set()
+        self.rewards = 0
+        self.logger.debug("[{0}] - PJFScheduler successfully initialized".format(time.strftime("%H:%M:%S")))
+
+    def choice(self, rng, group, candidates):
+        """
+        Select one of the candidates of the given group (type mutators or havoc actions) using rng
+        """
+        weights = [self.weights.get((group, c), 1.0) for c in candidates]
+        point = rng.random() * sum(weights)
+        selected = candidates[-1]
+        for candidate, weight in zip(candidates, weights):
+            point -= weight
+            if point < 0:
+                selected = candidate
+                break
+        self.stats_for(group, selected)["selected"] += 1
+        self.used.add((group, selected))
+        return selected
+
+    def stats_for(self, group, operator):
+        """
+        Return the counters of an operator, creating them if needed
+        """
+        key = (group, operator)
+        if key not in self.operators:
+            self.operators[key] = {"selected": 0, "crashes": 0, "edges": 0, "errors": 0}
+        return self.operators[key]
+
+    def reward(self, crashed=False, edges=0, stderr=None):
+        """
+        Credit the operators used by the last testcase with its outcome
+        """
+        error = self.new_error(stderr)
+        for group, operator in self.used:
+            stats = self.stats_for(group, operator)
+            if crashed:
+                stats["crashes"] += 1
+            if edges:
+                stats["edges"] += edges
+            if error:
+                stats["errors"] += 1
+        self.used = set()
+        self.rewards += 1
+        if self.rewards % self.PERIOD == 0:
+            self.update()
+
+    def new_error(self, stderr):
+        """
+        Return True if the target printed an error message never seen before, numbers are ignored
+        """
+        if not stderr:
+            return False
+        if isinstance(stderr, bytes):
+            stderr = stderr.decode("utf-8", "replace")
+        digest = hashlib.sha1(re.sub("[0-9]+", "", stderr).encode("utf-8")).hexdigest()
+        if digest in self.errors:
+            return False
+        self.errors.add(digest)
+        return True
+
+    def yield_of(self, stats):
+        """
+        Productive findings per selection of an operator
+        """
+        found = stats["crashes"] * self.CRASH_REWARD + stats["edges"] + stats["errors"]
+        return float(found) / (stats["selected"] + 1)
+
+    def update(self):
+        """
+        Recompute the selection weights of each group according to the yield of its operators
+        """
+        groups = {}
+        for key in self.operators:
+            groups.setdefault(key[0], []).append(key)
+        for group in groups:
+            yields = dict((key, self.yield_of(self.operators[key])) for key in groups[group])
+            total = sum(yields.values())
+            if total == 0:
+                continue
+            # weights average to 1.0, the weight of operators never selected so far
+            for key in yields:
+                self.weights[key] = max(yields[key] / total, self.MIN_SHARE) * len(yields)
+
+    @property
+    def stats(self):
+        """
+        Return the statistics of each operator along with its current weight
+        """
+        stats = {}
+        for group, operator in sorted(self.operators, key=lambda k: (k[0], k[1])):
+            counters = dict(self.operators[(group, operator)])
+            counters["weight"] = self.weights.get((group, operator), 1.0)
+            stats["{0}_{1}".format(group, operator)] = counters
+        return stats
+
+    def init_logger(self):
+        """
+        Init the default logger
+        """
+        return PJFLogger.init_logger()
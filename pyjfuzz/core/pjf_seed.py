@@ -0,0 +1,50 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import hashlib
+import random
+import struct
+
+
+class PJFSeed(object):
+    """
+    Class used to derive reproducible per-testcase seeds from a campaign seed
+    """
+
+    # campaign seeds are sent as 64 bit integers in the testcase index frames
+    MAX_SEED = 0xffffffffffffffff
+
+    @staticmethod
+    def generate():
+        """
+        Generate a new random campaign seed
+        """
+        return random.SystemRandom().randint(0, 0xffffffff)
+
+    @staticmethod
+    def derive(seed, worker_id=0, iteration=0):
+        """
+        Derive the seed of a single testcase from the campaign seed, the worker id and the iteration number
+        """
+        digest = hashlib.sha1("{0}:{1}:{2}".format(seed, worker_id, iteration).encode("ascii")).digest()
+        return struct.unpack("<Q", digest[:8])[0]
@@ -27,13 +27,16 @@ from bottle import route, run, ServerAdapter, response, request, static_file
 from .pjf_testcase_server import PJFTestcaseServer
 from .errors import PJFBaseException
 from .errors import PJFMissingArgument
-from threading import Thread
+from threading import Thread, Event
 from .pjf_logger import PJFLogger
 from .pjf_factory import PJFFactory
+from .pjf_profiler import PJFProfiler
+from .pjf_stats import PJFStats
 from .certs import CERT_PATH
 import multiprocessing
 import signal
 import time
+import json
 import ssl
 import sys
 import os
@@ -76,6 +79,10 @@ class PJFServer:
     """
     Class used to run both HTTP and HTTPS server using bottle web server
     """
+
+    # seconds given to a server process to exit after SIGTERM before it is killed
+    STOP_TIMEOUT = 5
+
     def __init__(self, configuration):
         self.client_queue = multiprocessing.Queue(0)
         self.apply_patch()
@@ -93,12 +100,19 @@ class PJFServer:
             configuration.content_type = "application/json"
         self.config = configuration
         self.json = PJFFactory(configuration)
+        self.stats = PJFStats(configuration, workers=2)
+        self.json.stats = self.stats
+        self.stopped = Event()
         self.https = SSLWSGIRefServer(host="0.0.0.0", port=self.config.ports["servers"]["HTTPS_PORT"])
         self.http = WSGIRefServer(host="0.0.0.0", port=self.config.ports["servers"]["HTTP_PORT"])
-        self.httpsd = multiprocessing.Process(target=run, kwargs={"server": self.https, "quiet": True})
-        self.httpd = multiprocessing.Process(target=run, kwargs={"server": self.http, "quiet": True})
+        worker_id = self.json.worker_id * 2
+        self.httpsd = multiprocessing.Process(target=self.run_server, args=(self.https, worker_id + 1))
+        self.httpd = multiprocessing.Process(target=self.run_server, args=(self.http, worker_id))
         if self.config.fuzz_web:
             self.request_checker = Thread(target=self.request_pool, args=())
+        if self.config.stats:
+            self.status_checker = Thread(target=self.status_pool, args=())
+            self.status_checker.daemon = True
         self.logger.debug("[{0}] - PJFServer successfully initialized".format(time.strftime("%H:%M:%S")))
 
     def run(self):
@@ -106,13 +120,30 @@ class PJFServer:
         Start the servers
         """
         route("/")(self.serve)
+        route("/stats")(self.get_stats)
         if self.config.html:
             route("/<filepath:path>")(self.custom_html)
         if self.config.fuzz_web:
             self.request_checker.start()
+        if self.config.stats:
+            self.status_checker.start()
         self.httpd.start()
         self.httpsd.start()
 
+    def run_server(self, server, worker_id):
+        """
+        Run a single server, each server process gets its own worker id so testcases never share an index
+        """
+        self.json.worker_id = worker_id
+        self.stats.bind(worker_id)
+        # multiprocessing children skip atexit, leave through SystemExit so the profile is dumped below
+        signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+        try:
+            run(server=server, quiet=True)
+        finally:
+            if PJFProfiler.active:
+                PJFProfiler.active.dump()
+
     def save_testcase(self, ip, testcases):
         try:
             count = 0
@@ -122,13 +153,20 @@ class PJFServer:
                 os.mkdir(dir_name)
             except OSError:
                 pass
+            # regenerating a saved testcase is not fuzzing work, keep it out of the counters
+            self.json.stats = None
             for test in testcases:
+                test = self.json.testcase(test[2], worker_id=test[1], seed=test[0])
+                if not isinstance(test, bytes):
+                    test = test.encode("utf-8")
                 with open("{0}/testcase_{1}.json".format(dir_name, count), "wb") as t:
                     t.write(test)
                     t.close()
                     count += 1
         except Exception as e:
             raise PJFBaseException(e.message if hasattr(e, "message") else str(e))
+        finally:
+            self.json.stats = self.stats
 
     def request_pool(self):
         try:
@@ -155,16 +193,30 @@ class PJFServer:
                     if time.time() - clients[c]["timestamp"] >= 30:
                         self.save_testcase(c, clients[c]["testcases"])
                         del clients[c]
+                self.stats.set("queue", sum(len(clients[c]["testcases"]) for c in clients))
         except Exception as e:
             raise PJFBaseException(e.message if hasattr(e, "message") else str(e))
 
 
+    def status_pool(self):
+        """
+        Print a status line periodically until the servers are stopped
+        """
+        while not self.stopped.wait(PJFStats.STATUS_INTERVAL):
+            print(self.stats.status_line())
+
     def stop(self):
         """
         Kill the servers
         """
-        os.kill(self.httpd.pid, signal.SIGKILL)
-        os.kill(self.httpsd.pid, signal.SIGKILL)
+        self.stopped.set()
+        for server in [self.httpd, self.httpsd]:
+            if server.is_alive():
+                server.terminate()
+                server.join(self.STOP_TIMEOUT)
+            if server.is_alive():
+                os.kill(server.pid, signal.SIGKILL)
+                server.join()
         self.client_queue.put((0,0))
         if self.config.fuzz_web:
             self.request_checker.join()
@@ -182,20 +234,39 @@ class PJFServer:
         except Exception as e:
             raise PJFBaseException(e.message if hasattr(e, "message") else str(e))
 
+    def get_stats(self):
+        """
+        Serve the campaign statistics as JSON
+        """
+        try:
+            response.headers.append("Access-Control-Allow-Origin", "*")
+            response.headers.append("Content-Type", "application/json")
+            return json.dumps(self.stats.snapshot(), sort_keys=True)
+        except Exception as e:
+            raise PJFBaseException(e.message if hasattr(e, "message") else str(e))
+
     def serve(self):
         """
         Serve fuzzed JSON object
         """
         try:
-            fuzzed = self.json.fuzzed
+            buffers = self.json.fuzzed_buffers
+            start = PJFStats.now()
+            index = (self.json.seed, self.json.worker_id, self.json.iteration - 1)
             if self.config.fuzz_web:
-                self.client_queue.put((request.environ.get('REMOTE_ADDR'), fuzzed))
+                self.client_queue.put((request.environ.get('REMOTE_ADDR'), index))
             response.headers.append("Access-Control-Allow-Origin", "*")
             response.headers.append("Accept-Encoding", "identity")
             response.headers.append("Content-Type", self.config.content_type)
             if self.config.notify:
-                PJFTestcaseServer.send_testcase(fuzzed, '127.0.0.1', self.config.ports["servers"]["TCASE_PORT"])
-            yield fuzzed
+                if self.config.notify_index:
+                    PJFTestcaseServer.send_testcase_index(index[0], index[1], index[2], '127.0.0.1',
+                                                          self.config.ports["servers"]["TCASE_PORT"])
+                else:
+                    PJFTestcaseServer.send_testcase(buffers, '127.0.0.1', self.config.ports["servers"]["TCASE_PORT"])
+            for buf in buffers:
+                yield buf
+            self.stats.add("deliver_ns", PJFStats.now() - start)
         except Exception as e:
             raise PJFBaseException(e.message if hasattr(e, "message") else str(e))
 
@@ -0,0 +1,194 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from .pjf_logger import PJFLogger
+import time
+
+
+class PJFSplicer(object):
+    """
+    Structure aware crossover, graft subtrees taken from donor documents into the JSON being fuzzed
+    """
+
+    # maximum depth of the resulting document (root children are at depth 1)
+    MAX_DEPTH = 8
+    # maximum number of subtrees grafted into a single document
+    MAX_GRAFTS = 3
+
+    def __init__(self, configuration=None):
+        """
+        Init the splicer without donors, the document itself is used as donor until one is added
+        """
+        self.logger = self.init_logger()
+        self.config = configuration
+        self.depth = (configuration.splice_depth if configuration else False) or self.MAX_DEPTH
+        self.donors = []
+        self.seed = None
+        self.logger.debug("[{0}] - PJFSplicer successfully initialized".format(time.strftime("%H:%M:%S")))
+
+    def __len__(self):
+        """
+        Number of available donors
+        """
+        return len(self.donors)
+
+    def add(self, donor):
+        """
+        Index the subtrees of a new donor document
+        """
+        if type(donor) in (dict, list):
+            index = self.index(donor)
+            if index[0]:
+                self.donors.append(index)
+
+    def load(self, obj):
+        """
+        Index the graft sites of the document being spliced, the index is reused until another document comes in
+        """
+        if self.seed is None or self.seed[0] is not obj:
+            donor = self.index(obj)
+            self.seed = (obj, [node for node in donor[0] if len(node[0]) <= self.depth], donor)
+        return self.seed
+
+    def index(self, obj):
+        """
+        Return the nodes below obj along with the indexes of the nodes sharing each dictionary key
+        """
+        nodes = self.nodes(obj)
+        keys = {}
+        for i, node in enumerate(nodes):
+            if not isinstance(node[1], int):
+                keys.setdefault(node[1], []).append(i)
+        return nodes, keys
+
+    def nodes(self, obj):
+        """
+        Return a list of (path, key, value, height, end) for every node below obj, in pre-order so that the
+        subtree of nodes[i] is nodes[i + 1:end]
+        """
+        nodes = []
+        self.walk(obj, (), nodes)
+        return nodes
+
+    def walk(self, obj, path, nodes):
+        """
+        Collect the nodes below obj, return the height of obj
+        """
+        if type(obj) == dict:
+            items = obj.items()
+        elif type(obj) == list:
+            items = enumerate(obj)
+        else:
+            return 0
+        height = 1
+        for key, value in items:
+            node_path = path + (key,)
+            index = len(nodes)
+            nodes.append(None)
+            child = self.walk(value, node_path, nodes)
+            nodes[index] = (node_path, key, value, child, len(nodes))
+            height = max(height, child + 1)
+        return height
+
+    def splice(self, obj, rng):
+        """
+        Return a copy of obj with up to MAX_GRAFTS donor subtrees grafted into it, only the spine is copied
+        """
+        if type(obj) not in (dict, list):
+            return obj
+        _, seed, own = self.load(obj)
+        sites = seed
+        for _ in range(0, rng.randint(1, self.MAX_GRAFTS)):
+            if not sites:
+                break
+            donor = self.donors[rng.randint(0, len(self.donors) - 1)] if self.donors else own
+            chosen = self.select(sites, donor, rng)
+            if chosen is None:
+                continue
+            if sites is seed:
+                # the seed index is shared by every call, it is copied before the first update
+                sites = list(sites)
+            site, node = sites[chosen[0]], donor[0][chosen[1]]
+            obj = self.graft(obj, site[0], node[2])
+            sites[chosen[0]:self.subtree(sites, chosen[0])] = self.reroot(site, donor[0], chosen[1])
+        return obj
+
+    def subtree(self, sites, i):
+        """
+        Return the index following the last site below sites[i]
+        """
+        path = sites[i][0]
+        end = i + 1
+        while end < len(sites) and sites[end][0][:len(path)] == path:
+            end += 1
+        return end
+
+    def reroot(self, site, nodes, i):
+        """
+        Return the sites of the donor subtree nodes[i] once grafted in place of site
+        """
+        node = nodes[i]
+        sites = [(site[0], site[1], node[2], node[3], None)]
+        for path, key, value, height, _ in nodes[i + 1:node[4]]:
+            sites.append((site[0] + path[len(node[0]):], key, value, height, None))
+        return sites
+
+    def select(self, sites, donor, rng):
+        """
+        Choose a site and a donor subtree fitting the depth budget, prefer sites sharing the donor key.
+        Return the (site, donor node) indexes
+        """
+        nodes, keys = donor
+        matching = []
+        if rng.randint(0, 1) == 0:
+            matching = [i for i, site in enumerate(sites) if site[1] in keys]
+        if matching:
+            site = matching[rng.randint(0, len(matching) - 1)]
+            candidates = keys[sites[site][1]]
+        else:
+            site = rng.randint(0, len(sites) - 1)
+            candidates = range(0, len(nodes))
+        budget = self.depth - len(sites[site][0])
+        candidates = [i for i in candidates if nodes[i][3] <= budget]
+        if not candidates:
+            return None
+        return site, candidates[rng.randint(0, len(candidates) - 1)]
+
+    def graft(self, obj, path, value):
+        """
+        Replace the node at path with value, containers along the path are shallow copied
+        """
+        if not path:
+            return value
+        if type(obj) == dict:
+            spine = dict(obj)
+        else:
+            spine = list(obj)
+        spine[path[0]] = self.graft(obj[path[0]], path[1:], value)
+        return spine
+
+    def init_logger(self):
+        """
+        Init the default logger
+        """
+        return PJFLogger.init_logger()
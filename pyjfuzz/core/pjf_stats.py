@@ -0,0 +1,152 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from .pjf_logger import PJFLogger
+import multiprocessing
+import hashlib
+import time
+import re
+
+
+class PJFStats(object):
+    """
+    Campaign counters kept in shared memory, every worker writes its own slot and totals are computed on read
+    """
+
+    FIELDS = ["execs", "testcases", "crashes", "hangs", "buckets", "queue", "generate_ns", "encode_ns",
+              "deliver_ns", "execute_ns"]
+    STAGES = ["generate", "encode", "deliver", "execute"]
+    # seconds between two status lines
+    STATUS_INTERVAL = 5
+
+    def __init__(self, configuration=None, workers=1):
+        """
+        Allocate the shared counters, must be created before forking the workers
+        """
+        self.logger = self.init_logger()
+        self.config = configuration
+        self.workers = workers
+        self.counters = multiprocessing.RawArray("d", workers * len(self.FIELDS))
+        self.index = dict((field, i) for i, field in enumerate(self.FIELDS))
+        self.slot = 0
+        self.start = time.time()
+        self.last_status = self.start
+        self.buckets = set()
+        self.logger.debug("[{0}] - PJFStats successfully initialized".format(time.strftime("%H:%M:%S")))
+
+    @staticmethod
+    def now():
+        """
+        Monotonic time in nanoseconds
+        """
+        if hasattr(time, "perf_counter_ns"):
+            return time.perf_counter_ns()
+        return int(time.time() * 1e9)
+
+    def bind(self, slot):
+        """
+        Select the slot updated by the current process
+        """
+        self.slot = slot % self.workers
+
+    def add(self, field, value=1):
+        """
+        Increment a counter of the current slot
+        """
+        self.counters[self.slot * len(self.FIELDS) + self.index[field]] += value
+
+    def set(self, field, value):
+        """
+        Set a gauge of the current slot
+        """
+        self.counters[self.slot * len(self.FIELDS) + self.index[field]] = value
+
+    def crash(self, return_code, stderr=None):
+        """
+        Record a crash (or a hang when the target timed out), crashes are bucketed by signal and error output
+        """
+        if return_code == -1:
+            self.add("hangs")
+            return
+        self.add("crashes")
+        if isinstance(stderr, bytes):
+            stderr = stderr.decode("utf-8", "replace")
+        digest = hashlib.sha1(re.sub("0x[0-9a-fA-F]+|[0-9]+", "", stderr or "").encode("utf-8")).hexdigest()
+        self.buckets.add((return_code, digest))
+        self.set("buckets", len(self.buckets))
+
+    def due(self):
+        """
+        Return True once every STATUS_INTERVAL seconds
+        """
+        if time.time() - self.last_status < self.STATUS_INTERVAL:
+            return False
+        self.last_status = time.time()
+        return True
+
+    def snapshot(self):
+        """
+        Aggregate the counters of every slot into a dictionary
+        """
+        totals = dict((field, 0) for field in self.FIELDS)
+        size = len(self.FIELDS)
+        for slot in range(0, self.workers):
+            for field in self.FIELDS:
+                totals[field] += self.counters[slot * size + self.index[field]]
+        elapsed = max(time.time() - self.start, 1e-9)
+        stats = {
+            "elapsed": round(elapsed, 3),
+            "workers": self.workers,
+            "execs_per_sec": round(totals["execs"] / elapsed, 3),
+            "testcases_per_sec": round(totals["testcases"] / elapsed, 3),
+            "stages": {}
+        }
+        for field in self.FIELDS:
+            if not field.endswith("_ns"):
+                stats[field] = int(totals[field])
+        for stage in self.STAGES:
+            total = totals["{0}_ns".format(stage)]
+            count = totals["execs"] if stage == "execute" else totals["testcases"]
+            stats["stages"][stage] = {
+                "total_ms": round(total / 1e6, 3),
+                "avg_us": round(total / count / 1e3, 3) if count else 0
+            }
+        return stats
+
+    def status_line(self):
+        """
+        Return a one line summary of the campaign
+        """
+        stats = self.snapshot()
+        stages = " ".join("{0}={1}us".format(stage, stats["stages"][stage]["avg_us"]) for stage in self.STAGES)
+        return "[\033[92mSTATS\033[0m] {0}s testcases={1} ({2}/s) execs={3} ({4}/s) crashes={5} hangs={6} " \
+               "buckets={7} queue={8} {9}".format(int(stats["elapsed"]), stats["testcases"],
+                                                  stats["testcases_per_sec"], stats["execs"], stats["execs_per_sec"],
+                                                  stats["crashes"], stats["hangs"], stats["buckets"], stats["queue"],
+                                                  stages)
+
+    def init_logger(self):
+        """
+        Init the default logger
+        """
+        return PJFLogger.init_logger()
@@ -21,16 +21,19 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
-import sys
 import time
 import threading
 import struct
 import socket
 from .pjf_logger import PJFLogger
+from .pjf_buffers import PJFBuffers
 from .errors import PJFMissingArgument, PJFBaseException, PJFSocketError
 
 
 class PJFTestcaseServer(object):
+
+    INDEX_FRAME = 0xffffffff
+
     def __init__(self, configuration):
         self.logger = self.init_logger()
         if ["ports"] not in configuration:
@@ -49,10 +52,11 @@ class PJFTestcaseServer(object):
         Handle the actual TCP connection
         """
         try:
-            size = struct.unpack("<I", sock.recv(4))[0]
-            data = ""
-            while len(data) < size:
-                data += sock.recv(size - len(data))
+            size = struct.unpack("<I", self.recv_all(sock, 4))[0]
+            if size == self.INDEX_FRAME:
+                data = struct.unpack("<QIQ", self.recv_all(sock, 20))
+            else:
+                data = self.recv_all(sock, size)
             if len(self.testcase) >= 100:
                 del self.testcase
                 self.testcase = list()
@@ -63,6 +67,19 @@ class PJFTestcaseServer(object):
         except Exception as e:
             raise  PJFBaseException(e.message)
 
+    @staticmethod
+    def recv_all(sock, size):
+        """
+        Receive exactly size bytes from the socket
+        """
+        data = b""
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data
+
     def _shutdown(self, *args):
         """
         Kill TCP server
@@ -114,20 +131,42 @@ class PJFTestcaseServer(object):
     @staticmethod
     def send_testcase(json, ip, port):
         """
-        Send a raw testcase
+        Send a raw testcase, json may also be a list of buffers sent without joining them
         """
         try:
-            json = struct.pack("<I", len(json)) + json
-            try:
-                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                s.connect((ip, int(port)))
-                s.send(json)
-                s.shutdown(socket.SHUT_RDWR)
-                s.close()
-                return True
-            except socket.error:
-                return False
+            if type(json) != list:
+                json = [PJFBuffers.to_bytes(json)]
+            size = sum(len(buf) for buf in json)
+            return PJFTestcaseServer.send_frame([struct.pack("<I", size)] + json, ip, port)
         except socket.error as e:
             raise PJFSocketError(e.message if hasattr(e, "message") else str(e))
         except Exception as e:
-            raise  PJFBaseException(e.message)
+            raise  PJFBaseException(e.message if hasattr(e, "message") else str(e))
+
+    @staticmethod
+    def send_testcase_index(seed, worker_id, iteration, ip, port):
+        """
+        Send only the seed, worker id and iteration of a testcase, the receiver regenerates it when needed
+        """
+        try:
+            frame = struct.pack("<IQIQ", PJFTestcaseServer.INDEX_FRAME, seed, worker_id, iteration)
+            return PJFTestcaseServer.send_frame(frame, ip, port)
+        except socket.error as e:
+            raise PJFSocketError(e.message if hasattr(e, "message") else str(e))
+        except Exception as e:
+            raise  PJFBaseException(e.message if hasattr(e, "message") else str(e))
+
+    @staticmethod
+    def send_frame(frame, ip, port):
+        """
+        Send a raw frame (bytes or list of buffers) to the testcase server
+        """
+        try:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.connect((ip, int(port)))
+            PJFBuffers.send(s, frame if type(frame) == list else [frame])
+            s.shutdown(socket.SHUT_RDWR)
+            s.close()
+            return True
+        except socket.error:
+            return False
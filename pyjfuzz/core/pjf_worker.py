@@ -28,11 +28,16 @@ from .pjf_server import PJFServer
 from .pjf_factory import PJFFactory
 from .pjf_process_monitor import PJFProcessMonitor
 from .pjf_external_fuzzer import PJFExternalFuzzer
+from .pjf_coverage import PJFCoverage
+from .pjf_corpus import PJFCorpus
+from .pjf_seed import PJFSeed
+from .pjf_stats import PJFStats
 from .errors import PJFMalformedJSON
 from argparse import Namespace
 import socket
 import tempfile
 import json as json_eval
+import signal
 import time
 import sys
 import os
@@ -48,7 +53,8 @@ class PJFWorker(object):
             if not self.config.auto:
                 to_fuzz = {'lvl1': {"lvl2": [1, 1.0, "True"]}, "lvl1-1": [{"none": None, "inf": [{"a": {"a": "a"}}]}]}
             else:
-                to_fuzz = self.config.generate_json(self.config.grammar_path)
+                to_fuzz = self.config.generate_json(self.config.grammar_path, PJFSeed.derive(self.config.seed),
+                                                    self.config.auto_size)
             run = "{0} http://127.0.0.1:8080/fuzzer.html".format(self.config.browser_auto)
             config = PJFConfiguration(Namespace(json=to_fuzz,
                                                 html=TOOLS_DIR,
@@ -60,7 +66,9 @@ class PJFWorker(object):
                                                 utf8=self.config.utf8,
                                                 indent=self.config.indent,
                                                 notify=True,
+                                                notify_index=True,
                                                 strong_fuzz=self.config.strong_fuzz,
+                                                seed=self.config.seed,
                                                 process_to_monitor=run,
                                                 recheck_ports=False))
             monitor = PJFProcessMonitor(config)
@@ -81,7 +89,8 @@ class PJFWorker(object):
             if not self.config.auto:
                 to_fuzz = {'lvl1': {"lvl2": [1, 1.0, "True"]}, "lvl1-1": [{"none": None, "inf": [{"a": {"a": "a"}}]}]}
             else:
-                to_fuzz = self.config.generate_json(self.config.grammar_path)
+                to_fuzz = self.config.generate_json(self.config.grammar_path, PJFSeed.derive(self.config.seed),
+                                                    self.config.auto_size)
             run = "{0} http://127.0.0.1:8080/fuzzer.html".format(self.config.browser_auto)
             config = PJFConfiguration(Namespace(json=to_fuzz,
                                                 html=TOOLS_DIR,
@@ -93,8 +102,10 @@ class PJFWorker(object):
                                                 utf8=self.config.utf8,
                                                 indent=self.config.indent,
                                                 notify=True,
+                                                notify_index=True,
                                                 fuzz_web=True,
                                                 strong_fuzz=self.config.strong_fuzz,
+                                                seed=self.config.seed,
                                                 process_to_monitor=run,
                                                 recheck_ports=False))
             server = PJFServer(config)
@@ -212,7 +223,8 @@ class PJFWorker(object):
             if result:
                 print("[\033[92mINFO\033[0m] Program crashed with \033[91mSIGSEGV\033[0m/\033[91mSIGABRT\033[0m/\033[91mSIGHUP\033[0m")
                 if self.config.debug:
-                    print("[\033[92mINFO\033[0m] Saving testcase...")
+                    print("[\033[92mINFO\033[0m] Saving testcase (seed {0}, worker {1}, iteration {2})...".format(
+                        self.config.seed, j.worker_id, j.iteration - 1))
                 try:
                     os.mkdir(dir_name)
                 except OSError:
@@ -227,6 +239,133 @@ class PJFWorker(object):
         except Exception as e:
             raise PJFBaseException(e.message if hasattr(e, "message") else str(e))
 
+    def fuzz_corpus(self):
+        try:
+            import shlex
+            name = os.path.basename(shlex.split(self.config.command[0])[0])
+            dir_name = "testcase_{0}".format(name)
+            corpus = PJFCorpus(self.config)
+            if self.config.corpus_dir:
+                corpus.load_dir(self.config.corpus_dir)
+                print("[\033[92mINFO\033[0m] Loaded {0} corpus entries from {1}".format(len(corpus),
+                                                                                  self.config.corpus_dir))
+                setattr(self.config, "json", corpus.entries[0]["json"])
+            else:
+                corpus.add(self.config.json)
+                if self.config.auto:
+                    for obj in self.config.generate_corpus(self.config.grammar_path,
+                                                           seed=PJFSeed.derive(self.config.seed, self.config.worker_id),
+                                                           size=self.config.auto_size):
+                        if obj != self.config.json:
+                            corpus.add(obj)
+                    print("[\033[92mINFO\033[0m] Generated {0} corpus entries from grammar".format(len(corpus)))
+            factory = PJFFactory(self.config)
+            executor = PJFExternalFuzzer(self.config)
+            coverage = None
+            if self.config.coverage:
+                coverage = PJFCoverage(self.config)
+                executor.env = coverage.env
+            scheduler = factory.mutator.mutators.scheduler
+            if factory.splicer:
+                for entry in corpus.entries:
+                    factory.splicer.add(entry["json"])
+            stats = PJFStats(self.config)
+            factory.stats = stats
+            crashes = 0
+            self.running = True
+            signal.signal(signal.SIGINT, self.stop)
+            try:
+                while self.running:
+                    seed, energy = corpus.schedule()
+                    factory.load(seed["json"])
+                    for _ in range(energy):
+                        if not self.running:
+                            break
+                        testcase = factory.fuzzed
+                        if coverage:
+                            coverage.reset()
+                        start = PJFStats.now()
+                        crashed = self.execute_testcase(executor, testcase)
+                        elapsed = PJFStats.now() - start
+                        stats.add("execs")
+                        stats.add("execute_ns", elapsed)
+                        if crashed:
+                            stats.crash(executor.return_code, executor._err)
+                            path = "{0}/testcase_{1}.json".format(dir_name, crashes)
+                            # the index only identifies the testcase together with the corpus entry it was
+                            # mutated from (and the donors spliced into it), the testcase itself is saved
+                            print("[\033[92mINFO\033[0m] Program crashed, testcase saved as {0} (corpus entry {1}, "
+                                  "seed {2}, worker {3}, iteration {4})".format(path, seed["name"], factory.seed,
+                                                                                factory.worker_id,
+                                                                                factory.iteration - 1))
+                            try:
+                                os.mkdir(dir_name)
+                            except OSError:
+                                pass
+                            with open(path, "wb") as t:
+                                t.write(self.to_bytes(testcase))
+                                t.close()
+                            crashes += 1
+                            if factory.splicer:
+                                factory.splicer.add(corpus.parse(testcase))
+                        edges = coverage.update() if coverage else 0
+                        new_coverage = edges > 0
+                        corpus.record(seed, elapsed / 1e9, crashed or new_coverage)
+                        if scheduler:
+                            scheduler.reward(crashed, edges, executor._err)
+                        if new_coverage:
+                            entry = corpus.parse(testcase)
+                            if entry is not None:
+                                # entries found while fuzzing are named after the file they are saved to
+                                corpus.add(entry, corpus.save("corpus_{0}".format(name), entry))
+                                if factory.splicer:
+                                    factory.splicer.add(entry)
+                                if self.config.debug:
+                                    print("[\033[92mINFO\033[0m] New coverage, {0} edges and {1} corpus "
+                                          "entries".format(coverage.edges, len(corpus)))
+                        stats.set("queue", len(corpus))
+                        if self.config.stats and stats.due():
+                            print(stats.status_line())
+            finally:
+                if coverage:
+                    coverage.close()
+                if self.config.stats:
+                    print(stats.status_line())
+                if scheduler and self.config.debug:
+                    for operator, counters in sorted(scheduler.stats.items()):
+                        print("[\033[92mINFO\033[0m] {0}: {1}".format(operator, json_eval.dumps(counters,
+                                                                                          sort_keys=True)))
+        except Exception as e:
+            raise PJFBaseException(e.message if hasattr(e, "message") else str(e))
+
+    def stop(self, *args):
+        """
+        Stop the running fuzzing loop
+        """
+        self.running = False
+
+    def execute_testcase(self, executor, testcase):
+        """
+        Run the target with the given testcase (stdin or @@ temp file), return True if it crashed
+        """
+        if self.config.stdin:
+            return executor.execute_sigsegv(testcase)
+        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+            temp_file.write(self.to_bytes(testcase))
+            temp_file.close()
+        try:
+            return executor.execute_sigsegv(temp_file.name)
+        finally:
+            os.unlink(temp_file.name)
+
+    def to_bytes(self, testcase):
+        """
+        Return the testcase as bytes so it can be written to a file
+        """
+        if not isinstance(testcase, bytes):
+            return testcase.encode("utf-8")
+        return testcase
+
     def fuzz(self):
         try:
             json = PJFFactory(self.config)
@@ -22,16 +22,23 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+from .core.pjf_buffers import PJFBuffers
 from .core.pjf_configuration import PJFConfiguration
+from .core.pjf_corpus import PJFCorpus
+from .core.pjf_coverage import PJFCoverage
 from .core.pjf_decoretors import PJFDecorators
+from .core.pjf_dictionary import PJFDictionary
 from .core.pjf_encoder import PJFEncoder
 from .core.pjf_executor import PJFExecutor
 from .core.pjf_external_fuzzer import PJFExternalFuzzer
 from .core.pjf_factory import PJFFactory
+from .core.pjf_harness import PJFHarness, fuzz_function
 from .core.pjf_mutation import PJFMutation
 from .core.pjf_mutators import PJFMutators
 from .core.pjf_process_monitor import PJFProcessMonitor
 from .core.pjf_server import PJFServer
+from .core.pjf_splicer import PJFSplicer
+from .core.pjf_stats import PJFStats
 from .core.pjf_testcase_server import PJFTestcaseServer
 from .core.pjf_version import PYJFUZZ_VERSION
 from .core.errors import *
@@ -49,6 +49,9 @@ def main():
                        type=pjf_configuration.PJFConfiguration.valid_json, default=None, dest="json")
     group.add_argument('--F', metavar='FILE', help='Path to file', type=pjf_configuration.PJFConfiguration.valid_file,
                        default=None, dest="json_file")
+    group.add_argument('--C', metavar='DIR', help='Directory of seed JSON files, fuzz the command specified by'
+                                                  ' positional args using every seed',
+                       type=pjf_configuration.PJFConfiguration.valid_dir, default=None, dest="corpus_dir")
 
     group.add_argument('--auto', action='store_true', help='Automatically generate JSON init testcase', dest='auto',
                         default=False)
@@ -73,6 +76,9 @@ def main():
     parser.add_argument('-l', metavar='FUZZ LEVEL', help='Fuzz level [0-6]', type=int, default=6, required=False,
                         dest="level")
 
+    parser.add_argument('--seed', metavar='SEED', help='Seed used to reproduce a fuzzing session', type=int,
+                        default=None, required=False, dest="seed")
+
     parser.add_argument('-i', action='store_true', help='JSON indent', default=False, required=False,
                         dest="indent")
 
@@ -104,6 +110,53 @@ def main():
                                                         ' from --J switch, use @@ to indicate filename',
                         dest='cmd_fuzz', default=False, required=False)
 
+    parser.add_argument('--coverage', action='store_true', help='Coverage guided fuzzing of the command specified by'
+                                                                ' positional args (-c), the command must be linked'
+                                                                ' with the PyJFuzz coverage shim', dest='coverage',
+                        default=False, required=False)
+
+    parser.add_argument('--dict', metavar='FILE', help='Dictionary of tokens (AFL -x format or one token per line)'
+                                                      ' injected by the mutators', dest='dictionary',
+                        type=pjf_configuration.PJFConfiguration.valid_file, default=None, required=False)
+
+    parser.add_argument('--splice', action='store_true', help='Graft subtrees of other corpus entries and interesting'
+                                                              ' testcases into the fuzzed JSON', dest='splice',
+                        default=False, required=False)
+
+    parser.add_argument('--adaptive', action='store_true', help='Favor the mutators which produce crashes, new'
+                                                                ' coverage or new parser errors (-c)',
+                        dest='adaptive', default=False, required=False)
+
+    parser.add_argument('--stats', action='store_true', help='Print a status line with the campaign statistics every'
+                                                             ' few seconds', dest='stats', default=False,
+                        required=False)
+
+    parser.add_argument('--profile', action='store_true', help='Time every stage of the testcase pipeline, the'
+                                                               ' histograms are written to pjf_profile_<pid>.json on'
+                                                               ' exit or on SIGUSR1', dest='profile', default=False,
+                        required=False)
+
+    parser.add_argument('--profile-sample', metavar='N', help='Run cProfile on one pipeline call every N (implies'
+                                                              ' --profile)', type=int, dest='profile_sample',
+                        default=0, required=False)
+
+    parser.add_argument('--profile-memory', action='store_true', help='Trace memory allocations with tracemalloc'
+                                                                      ' (implies --profile)', dest='profile_memory',
+                        default=False, required=False)
+
+    parser.add_argument('--havoc-stack', metavar='N', help='Stack at most 2^N havoc mutations on a fuzzed object'
+                                                          ' (default 7)', type=int, dest='havoc_stack', default=None,
+                        required=False)
+
+    parser.add_argument('--havoc-time', metavar='MS', help='Stop stacking havoc mutations on a fuzzed object after MS'
+                                                           ' milliseconds, testcases are no longer reproducible by'
+                                                           ' seed', type=int, dest='havoc_time', default=0,
+                        required=False)
+
+    parser.add_argument('--auto-size', metavar='MIN:MAX', help='Size range in bytes of the JSON generated by --auto,'
+                                                               ' e.g. 1024:4096', dest='auto_size',
+                        type=pjf_configuration.PJFConfiguration.valid_size, default=None, required=False)
+
     parser.add_argument('--no-logo', action='store_true', help='Disable logo printing at startup', dest='nologo',
                         default=False)
 
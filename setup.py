@@ -36,7 +36,7 @@ def find_all_files_in_subdir(start_dir):
     return files
 
 def get_package_data():
-    data = ['core/certs/server.pem', 'core/conf/config.json']
+    data = ['core/certs/server.pem', 'core/conf/config.json', 'core/coverage/pjf_coverage.c']
     cur_dir = os.getcwd()
     os.chdir("pyjfuzz")
     data.extend(find_all_files_in_subdir("core/tools"))
@@ -73,6 +73,7 @@ setup(
               "pyjfuzz.core.errors",
               "pyjfuzz.core.certs",
               "pyjfuzz.core.conf",
+              "pyjfuzz.core.coverage",
               "pyjfuzz.core.tools",
               "pyjfuzz.core.patch"],
     package_data={'pyjfuzz': get_package_data()
@@ -83,5 +84,6 @@ setup(
             ],
     },
     install_requires=requires,
+    extras_require={'numpy': ['numpy']},
 )
 
@@ -30,6 +30,16 @@ from test import test_pjf_encoder
 from test import test_pjf_configuration
 from test import test_pjf_server
 from test import test_pjf_environment
+from test import test_pjf_coverage
+from test import test_pjf_harness
+from test import test_pjf_corpus
+from test import test_pjf_scheduler
+from test import test_pjf_dictionary
+from test import test_pjf_splicer
+from test import test_pjf_buffers
+from test import test_pjf_stats
+from test import test_pjf_profiler
+from test import test_pjf_grammar
 
 if __name__ == "__main__":
     print("PyJFuzz - Test Unit")
@@ -42,3 +52,13 @@ if __name__ == "__main__":
     test_pjf_server.test()
     test_pjf_encoder.test()
     test_pjf_process_monitor.test()
+    test_pjf_coverage.test()
+    test_pjf_harness.test()
+    test_pjf_corpus.test()
+    test_pjf_scheduler.test()
+    test_pjf_dictionary.test()
+    test_pjf_splicer.test()
+    test_pjf_buffers.test()
+    test_pjf_stats.test()
+    test_pjf_profiler.test()
+    test_pjf_grammar.test()
@@ -0,0 +1,12 @@
+#include <stdio.h>
+
+int main() {
+    int c = getchar();
+    if (c == '{')
+        puts("object");
+    else if (c == '[')
+        puts("array");
+    else
+        puts("value");
+    return 0;
+}
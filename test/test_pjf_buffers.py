@@ -0,0 +1,63 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from pyjfuzz.core.pjf_configuration import PJFConfiguration
+from pyjfuzz.core.pjf_executor import PJFExecutor
+from pyjfuzz.core.pjf_buffers import PJFBuffers
+from argparse import Namespace
+import unittest
+import socket
+
+__TITLE__ = "Testing PJFBuffers object"
+
+class TestPJFBuffers(unittest.TestCase):
+
+    def test_coalesce(self):
+        chunks = PJFBuffers.coalesce(["a" * 10, "b" * 10, "c" * 100, "d"], size=16)
+        self.assertEqual(chunks, [b"a" * 10 + b"b" * 10, b"c" * 100, b"d"])
+
+    def test_send(self):
+        left, right = socket.socketpair()
+        buffers = [b"x" * 70000] * 3 + [b"y"]
+        PJFBuffers.send(left, buffers)
+        left.close()
+        data = b""
+        while True:
+            chunk = right.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+        right.close()
+        self.assertEqual(data, b"".join(buffers))
+
+    def test_write_stdin(self):
+        executor = PJFExecutor(PJFConfiguration(Namespace(nologo=True)))
+        executor.spawn(["cat"], stdin_content=[b'{"a": ', b"1}"], stdin=True, timeout=2)
+        self.assertEqual(executor._out, b'{"a": 1}')
+
+def test():
+    print("=" * len(__TITLE__))
+    print(__TITLE__)
+    print("=" * len(__TITLE__))
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPJFBuffers)
+    unittest.TextTestRunner(verbosity=2).run(suite)
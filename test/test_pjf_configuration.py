@@ -22,6 +22,8 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 from pyjfuzz.core.pjf_configuration import PJFConfiguration
+from pyjfuzz.core.errors import PJFInvalidArgument
+from argparse import Namespace
 import unittest
 import argparse
 import sys
@@ -43,6 +45,28 @@ class TestPJFConfiguration(unittest.TestCase):
         for arg in parsed.__dict__:
             self.assertTrue(arg in args.__dict__)
 
+    def test_size_configuration(self):
+        self.assertEqual(PJFConfiguration.valid_size("1024:4096"), (1024, 4096))
+        self.assertEqual(PJFConfiguration.valid_size("0:0"), (0, 0))
+        for value in ["4:1", "-1:5", "4", "a:b"]:
+            with self.assertRaises(SystemExit):
+                PJFConfiguration.valid_size(value)
+
+    def test_havoc_configuration(self):
+        self.assertEqual(PJFConfiguration(Namespace(nologo=True, havoc_stack=1, havoc_time=0)).havoc_stack, 1)
+        self.assertEqual(PJFConfiguration(Namespace(nologo=True, havoc_stack=None)).havoc_stack, None)
+        with self.assertRaises(PJFInvalidArgument):
+            PJFConfiguration(Namespace(nologo=True, havoc_stack=0))
+        with self.assertRaises(PJFInvalidArgument):
+            PJFConfiguration(Namespace(nologo=True, havoc_time=-1))
+
+    def test_seed_configuration(self):
+        self.assertEqual(PJFConfiguration(Namespace(nologo=True, seed=0xffffffffffffffff)).seed, 0xffffffffffffffff)
+        with self.assertRaises(PJFInvalidArgument):
+            PJFConfiguration(Namespace(nologo=True, seed=0x10000000000000000))
+        with self.assertRaises(PJFInvalidArgument):
+            PJFConfiguration(Namespace(nologo=True, seed=-1))
+
 
 def test():
     print("=" * len(__TITLE__))
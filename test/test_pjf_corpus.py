@@ -0,0 +1,90 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from pyjfuzz.core.pjf_configuration import PJFConfiguration
+from pyjfuzz.core.pjf_corpus import PJFCorpus
+from pyjfuzz.core.errors import PJFBaseException
+from argparse import Namespace
+import tempfile
+import unittest
+import shutil
+import os
+
+__TITLE__ = "Testing PJFCorpus object"
+
+class TestPJFCorpus(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_name = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_name)
+
+    def write_seed(self, name, content):
+        with open(os.path.join(self.dir_name, name), "w") as seed:
+            seed.write(content)
+            seed.close()
+
+    def test_load_dir(self):
+        self.write_seed("a.json", '{"a": 1}')
+        self.write_seed("b.json", '[1, 2, 3]')
+        self.write_seed("c.txt", 'not a json')
+        corpus = PJFCorpus(PJFConfiguration(Namespace(nologo=True, seed=1)))
+        corpus.load_dir(self.dir_name)
+        self.assertEqual(len(corpus), 2)
+        self.assertEqual(corpus.entries[0]["json"], {"a": 1})
+        self.assertEqual(corpus.entries[1]["name"], "b.json")
+
+    def test_save(self):
+        corpus = PJFCorpus(PJFConfiguration(Namespace(nologo=True, seed=1)))
+        dir_name = os.path.join(self.dir_name, "corpus")
+        path = corpus.save(dir_name, {"a": [1]})
+        self.assertEqual(path, os.path.join(dir_name, "entry_0.json"))
+        corpus.add({"a": [1]}, path)
+        self.assertEqual(corpus.entries[0]["name"], path)
+        with open(path) as entry:
+            self.assertEqual(entry.read(), '{"a": [1]}')
+
+    def test_load_empty_dir(self):
+        corpus = PJFCorpus(PJFConfiguration(Namespace(nologo=True, seed=1)))
+        self.assertRaises(PJFBaseException, corpus.load_dir, self.dir_name)
+
+    def test_energy(self):
+        corpus = PJFCorpus(PJFConfiguration(Namespace(nologo=True, seed=1)))
+        small = corpus.add({"a": 1})
+        big = corpus.add({"a": "A" * 1000})
+        corpus.record(small, 0.001)
+        corpus.record(big, 0.1)
+        self.assertTrue(corpus.energy(small) > corpus.energy(big))
+        before = corpus.energy(big)
+        corpus.record(big, 0.1, True)
+        self.assertTrue(corpus.energy(big) > before)
+        entries = [corpus.schedule()[0] for _ in range(4)]
+        self.assertEqual(entries, [small, big, small, big])
+
+def test():
+    print("=" * len(__TITLE__))
+    print(__TITLE__)
+    print("=" * len(__TITLE__))
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPJFCorpus)
+    unittest.TextTestRunner(verbosity=2).run(suite)
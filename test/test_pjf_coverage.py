@@ -0,0 +1,72 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from pyjfuzz.core.pjf_external_fuzzer import PJFExternalFuzzer
+from pyjfuzz.core.pjf_configuration import PJFConfiguration
+from pyjfuzz.core.pjf_coverage import PJFCoverage
+from pyjfuzz.core.coverage import SHIM_PATH
+from argparse import Namespace
+from test import TEST_PATH
+import subprocess
+import tempfile
+import unittest
+import shutil
+import os
+
+__TITLE__ = "Testing PJFCoverage object"
+
+class TestPJFCoverage(unittest.TestCase):
+
+    def setUp(self):
+        # the target is built outside of the source tree
+        self.build_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.build_dir)
+
+    def test_coverage(self):
+        shim = os.path.join(self.build_dir, "pjf_coverage.o")
+        binary = os.path.join(self.build_dir, "coverage")
+        subprocess.Popen(["gcc", "-c", SHIM_PATH, "-o", shim], stderr=subprocess.PIPE,
+                         stdout=subprocess.PIPE).wait()
+        subprocess.Popen(["gcc", "-fsanitize-coverage=trace-pc", os.path.join(TEST_PATH, "coverage.c"), shim, "-o",
+                          binary], stderr=subprocess.PIPE, stdout=subprocess.PIPE).wait()
+        coverage = PJFCoverage()
+        executor = PJFExternalFuzzer(PJFConfiguration(Namespace(nologo=True, command=[binary], stdin=True)))
+        executor.env = coverage.env
+        results = []
+        for testcase in ["{}", "{}", "[]"]:
+            coverage.reset()
+            executor.execute(testcase)
+            results.append(coverage.update())
+        coverage.close()
+        self.assertTrue(results[0] > 0)
+        self.assertEqual(results[1], 0)
+        self.assertTrue(results[2] > 0)
+
+def test():
+    print("=" * len(__TITLE__))
+    print(__TITLE__)
+    print("=" * len(__TITLE__))
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPJFCoverage)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,67 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from pyjfuzz.core.pjf_configuration import PJFConfiguration
+from pyjfuzz.core.pjf_dictionary import PJFDictionary
+from pyjfuzz.core.pjf_mutators import PJFMutators
+from argparse import Namespace
+import tempfile
+import unittest
+import os
+
+__TITLE__ = "Testing PJFDictionary object"
+
+class TestPJFDictionary(unittest.TestCase):
+
+    def setUp(self):
+        with tempfile.NamedTemporaryFile(delete=False) as dictionary:
+            dictionary.write(b'# comment\nkw_true="true"\n"\\x41\\"B"@2\nmagic_key\n\n"true"\n')
+            dictionary.close()
+        self.path = dictionary.name
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_load(self):
+        dictionary = PJFDictionary(PJFConfiguration(Namespace(nologo=True, dictionary=self.path)))
+        self.assertEqual(dictionary.tokens, ["true", "A\"B", "magic_key"])
+
+    def test_token_injection(self):
+        mutators = PJFMutators(PJFConfiguration(Namespace(nologo=True, level=6, dictionary=self.path)))
+        mutators.seed(1)
+        self.assertTrue(11 in mutators.actions)
+        results = [mutators.splice_token("value") for _ in range(0, 20)]
+        tokens = mutators.dictionary.tokens
+        self.assertTrue(any(r in tokens for r in results))
+        self.assertTrue(any(r.startswith("value") or r.endswith("value") for r in results if r not in tokens))
+        buf = list('{"a": [1, 2]}')
+        for _ in range(0, 20):
+            mutators.random_action(buf)
+        self.assertTrue(len(buf) > 0)
+
+def test():
+    print("=" * len(__TITLE__))
+    print(__TITLE__)
+    print("=" * len(__TITLE__))
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPJFDictionary)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -23,6 +23,12 @@ SOFTWARE.
 """
 from pyjfuzz.core.pjf_encoder import PJFEncoder
 import unittest
+import json
+import sys
+if sys.version_info >= (3, 0):
+    from urllib.parse import quote
+else:
+    from urllib import quote
 
 __TITLE__ = "Testing PJFEncoder"
 
@@ -39,6 +45,31 @@ class TestPJFEncoder(unittest.TestCase):
 
         self.assertTrue(encode())
 
+    def test_encode_fragments(self):
+        obj = {"a": [1, 2.5, None, True, {"b": "c"}], "d": {}, "e": []}
+        self.assertEqual("".join(PJFEncoder.fragments(obj)), json.dumps(obj))
+        self.assertEqual("".join(PJFEncoder.fragments(obj, indent=True)), json.dumps(obj, indent=5))
+        cache = {}
+        frozen = set([id(obj["a"])])
+        first = PJFEncoder.fragments(obj, frozen=frozen, cache=cache)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(first, PJFEncoder.fragments(obj, frozen=frozen, cache=cache))
+        self.assertEqual(len(cache), 1)
+
+    def test_url_encode_fragments(self):
+        obj = {"a b": ["/\u00e8?", {"c&d": 1}], "e": "\x01%"}
+        encoded = "".join(PJFEncoder.fragments(obj, url_encode=True, frozen=set([id(obj["a b"])]), cache={}))
+        self.assertEqual(encoded, quote("".join(PJFEncoder.fragments(obj))))
+
+    def test_encode_plain_list(self):
+        obj = {"a": [1, -2.5e+30, None, False, "1.5", "q\"uote"], "b": ["\x01", "\\x41", 7]}
+        self.assertEqual("".join(PJFEncoder.fragments(obj["a"])), json.dumps(obj["a"]))
+        self.assertEqual("".join(PJFEncoder.fragments(obj["b"])),
+                         "[{0}, {1}, 7]".format("".join(PJFEncoder.fragments("\x01")),
+                                                "".join(PJFEncoder.fragments("\\x41"))))
+        self.assertEqual("".join(PJFEncoder.fragments(obj, url_encode=True)),
+                         quote("".join(PJFEncoder.fragments(obj))))
+
 def test():
     print("=" * len(__TITLE__))
     print(__TITLE__)
@@ -23,6 +23,7 @@ SOFTWARE.
 """
 from pyjfuzz.core.pjf_configuration import PJFConfiguration
 from pyjfuzz.core.pjf_factory import PJFFactory
+from pyjfuzz.core.pjf_mutators import PJFMutators
 from argparse import Namespace
 import unittest
 
@@ -76,6 +77,44 @@ class TestPJFFactory(unittest.TestCase):
         self.assertTrue(json != json.fuzzed)
         self.assertTrue("abcd" in json.fuzzed)
 
+    def test_object_seed(self):
+        config = PJFConfiguration(Namespace(json={"a": ["b", 1, 2.0, None, True]}, nologo=True, level=6, seed=1337))
+        first = PJFFactory(config)
+        second = PJFFactory(config)
+        testcases = [first.fuzzed for _ in range(0, 10)]
+        self.assertEqual(testcases, [second.fuzzed for _ in range(0, 10)])
+        self.assertEqual(first.testcase(5), testcases[5])
+        self.assertEqual(first.iteration, 10)
+
+    def test_object_copy_on_write(self):
+        seed = {"a": {"b": [1, 2, {"c": "d"}]}, "e": {"f": "g"}}
+        json = PJFFactory(PJFConfiguration(Namespace(json=seed, parameters="f", nologo=True, level=6, seed=1)))
+        fuzzed = json.fuzz_elements(json.json)
+        self.assertTrue(fuzzed["a"] is seed["a"])
+        self.assertFalse(fuzzed["e"] is seed["e"])
+        json.fuzzed
+        self.assertEqual(seed, {"a": {"b": [1, 2, {"c": "d"}]}, "e": {"f": "g"}})
+
+    def test_object_buffers(self):
+        config = PJFConfiguration(Namespace(json={"a": [{"b": "c"}, 1, None], "d": "e"}, nologo=True, level=6, seed=1))
+        first = PJFFactory(config)
+        second = PJFFactory(config)
+        for _ in range(0, 10):
+            self.assertEqual(b"".join(first.fuzzed_buffers), second.fuzzed.encode("utf-8"))
+
+    def test_object_polyglot_pool(self):
+        config = PJFConfiguration(Namespace(json={"a": ["b", "c", "d"], "e": "f"}, nologo=True, level=6, seed=7))
+        first = PJFFactory(config)
+        testcases = [first.fuzzed for _ in range(0, 10)]
+        mutators = first.mutator.mutators
+        self.assertTrue(len(mutators.polyglot_pool) > 0)
+        for pool in mutators.polyglot_pool.values():
+            self.assertEqual(len(pool), mutators.POOL_SIZE)
+        # the pool only depends on the seed and the epoch, not on the testcases generated before
+        second = PJFFactory(config)
+        self.assertEqual(second.testcase(PJFMutators.POOL_EPOCH + 3), first.testcase(PJFMutators.POOL_EPOCH + 3))
+        self.assertEqual(second.testcase(7), testcases[7])
+
 
 
 def test():
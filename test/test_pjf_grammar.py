@@ -0,0 +1,166 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from pyjfuzz.core import GRAMMAR_PATH
+from collections import deque
+import unittest
+import tempfile
+import pickle
+import json
+import os
+
+try:
+    from gramfuzz import GramFuzzer, rand
+    from gramfuzz.errors import GramFuzzError
+    from gramfuzz.fields import Def, Ref, Int
+    import gramfuzz.fields
+    from pyjfuzz.core.pjf_grammar import generate_corpus
+except ImportError:
+    # the gramfuzz shipped with PyJFuzz is not installed
+    GramFuzzer = None
+
+__TITLE__ = "Testing PJFGrammar"
+
+@unittest.skipUnless(GramFuzzer, "gramfuzz is not installed")
+class TestPJFGrammar(unittest.TestCase):
+
+    def check_derivation(self, derivation):
+        last_end = {}
+        for node in range(0, len(derivation)):
+            start, end = derivation.span(node)
+            parent = derivation.parent[node]
+            self.assertTrue(node + derivation.size[node] <= len(derivation))
+            if parent == -1:
+                self.assertEqual((start, end), (0, len(derivation.text)))
+                continue
+            # children lie inside their parent, one after the other
+            self.assertTrue(parent < node < parent + derivation.size[parent])
+            self.assertTrue(derivation.start[parent] <= start <= end <= derivation.end[parent])
+            self.assertTrue(start >= last_end.get(parent, start))
+            last_end[parent] = end
+
+    def test_derivations(self):
+        fuzzer = GramFuzzer()
+        fuzzer.load_grammar(GRAMMAR_PATH)
+        derivations = []
+        rand.seed(1337)
+        res = list(fuzzer.gen(cat="json", num=50, max_recursion=10, derivations=derivations))
+        self.assertEqual([derivation.text for derivation in derivations], res)
+        rand.seed(1337)
+        self.assertEqual(list(fuzzer.gen(cat="json", num=50, max_recursion=10)), res)
+        for derivation in derivations[:20]:
+            self.check_derivation(derivation)
+            for _ in range(0, 10):
+                derivation = fuzzer.mutate(derivation)
+                self.check_derivation(derivation)
+                json.loads(derivation.text)
+
+    def test_size_budget(self):
+        fuzzer = GramFuzzer()
+        fuzzer.load_grammar(GRAMMAR_PATH)
+        rand.seed(1337)
+        for res in fuzzer.gen(cat="json", num=20, min_size=1024, max_size=4096, max_recursion=30):
+            # once the budget runs out the open references are closed the shortest way
+            self.assertTrue(1024 <= len(res) <= 4096 * 1.25)
+            json.loads(res)
+        self.assertEqual(gramfuzz.fields.MAX_SIZE, None)
+        fuzzer.min_size_retries = 5
+        with self.assertRaises(GramFuzzError):
+            fuzzer.gen(cat="json", num=1, min_size=1 << 20, max_size=16, max_nodes=16)
+        self.assertEqual(gramfuzz.fields.MAX_SIZE, None)
+        self.assertEqual(gramfuzz.fields.MAX_NODES, None)
+
+    def test_pickle_fields(self):
+        fuzzer = GramFuzzer()
+        fuzzer.load_grammar(GRAMMAR_PATH)
+        defs = pickle.loads(pickle.dumps(fuzzer.defs, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(sorted(defs.keys()), sorted(fuzzer.defs.keys()))
+        # RDef and RRef are declared inside the grammar file, they come back as Def and Ref
+        array = defs["json-def"]["json-array"][0]
+        self.assertEqual(type(array), Def)
+        self.assertEqual(array.cat, "json-def")
+        refs = []
+        fields = [array]
+        while len(fields) > 0:
+            field = fields.pop()
+            if isinstance(field, Ref):
+                refs.append(field)
+            fields.extend(getattr(field, "values", None) or [])
+        self.assertTrue(len(refs) > 0)
+        self.assertTrue(all(type(ref) == Ref and ref.cat == "json-def" for ref in refs))
+        self.assertEqual(type(fuzzer.defs["json-def"]["json-array"][0]).__name__, "RDef")
+        # class-level reads give the default value, not the slot descriptor
+        self.assertEqual(Int.min, Int().min)
+
+        class SmallInt(Int):
+            __slots__ = ()
+            max = 3
+
+        small = pickle.loads(pickle.dumps(SmallInt(), pickle.HIGHEST_PROTOCOL))
+        self.assertEqual((type(small), small.max), (Int, 3))
+
+        class ConstInt(Int):
+            __slots__ = ()
+
+            def build(self, pre=None, shortest=False):
+                return "1"
+
+        with self.assertRaises(GramFuzzError):
+            pickle.dumps(ConstInt(), pickle.HIGHEST_PROTOCOL)
+
+    def test_grammar_image(self):
+        fuzzer = GramFuzzer()
+        fuzzer.load_grammar(GRAMMAR_PATH)
+        rand.seed(1337)
+        res = list(fuzzer.gen(cat="json", num=50, max_recursion=10))
+        path = os.path.join(tempfile.mkdtemp(), "json.img")
+        fuzzer.save_image(path)
+        image = GramFuzzer()
+        image.load_image(path)
+        os.unlink(path)
+        self.assertTrue(GramFuzzer.instance() is image)
+        rand.seed(1337)
+        self.assertEqual(list(image.gen(cat="json", num=50, max_recursion=10)), res)
+
+    def test_generate_corpus(self):
+        corpus = generate_corpus(GRAMMAR_PATH, num=8, seed=1)
+        self.assertEqual(len(corpus), 8)
+        self.assertEqual(corpus, generate_corpus(GRAMMAR_PATH, num=8, seed=1))
+
+    def test_preferred_groups(self):
+        fuzzer = GramFuzzer()
+        for i in range(0, 9):
+            Def("a{0}".format(i), "a", cat="pref")
+        Def("b0", "b", cat="pref")
+        fuzzer.cat_groups["pref"] = {"ga": deque("a{0}".format(i) for i in range(0, 9)), "gb": deque(["b0"])}
+        res = list(fuzzer.gen(num=4000, cat="pref", preferred={"ga": 1, "gb": 1}, preferred_ratio=1.0))
+        self.assertTrue(0.45 < res.count("b") / float(len(res)) < 0.55)
+        res = list(fuzzer.gen(num=4000, cat="pref", preferred={"ga": 1, "gb": 3}, preferred_ratio=1.0))
+        self.assertTrue(0.7 < res.count("b") / float(len(res)) < 0.8)
+
+def test():
+    print("=" * len(__TITLE__))
+    print(__TITLE__)
+    print("=" * len(__TITLE__))
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPJFGrammar)
+    unittest.TextTestRunner(verbosity=2).run(suite)
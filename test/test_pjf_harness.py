@@ -0,0 +1,66 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from pyjfuzz.core.pjf_harness import fuzz_function
+import unittest
+import json
+import time
+
+__TITLE__ = "Testing PJFHarness object"
+
+
+def parse(testcase):
+    obj = json.loads(testcase)
+    if type(obj["a"]) != list:
+        raise ValueError("not a list")
+    return obj["a"][0] + 1
+
+
+def hang(testcase):
+    time.sleep(1)
+
+
+class TestPJFHarness(unittest.TestCase):
+
+    def test_fuzz_function(self):
+        findings = fuzz_function(parse, {"a": [1]}, iterations=200, seed=1337)
+        self.assertTrue(len(findings) > 0)
+        for bucket in findings:
+            self.assertEqual(findings[bucket]["testcase"] is not None, True)
+            self.assertTrue(findings[bucket]["count"] > 0)
+
+    def test_fuzz_function_jobs(self):
+        findings = fuzz_function(parse, {"a": [1]}, iterations=200, jobs=2, seed=1337)
+        self.assertTrue(len(findings) > 0)
+        self.assertTrue(set(findings[bucket]["worker"] for bucket in findings) <= set([0, 1]))
+
+    def test_fuzz_function_timeout(self):
+        findings = fuzz_function(hang, {"a": [1]}, iterations=2, timeout=0.05, seed=1337)
+        self.assertEqual(findings["timeout"]["count"], 2)
+
+def test():
+    print("=" * len(__TITLE__))
+    print(__TITLE__)
+    print("=" * len(__TITLE__))
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPJFHarness)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -23,6 +23,7 @@ SOFTWARE.
 """
 from pyjfuzz.core.pjf_configuration import PJFConfiguration
 from pyjfuzz.core.pjf_mutation import PJFMutation
+from pyjfuzz.core import pjf_mutators
 from argparse import Namespace
 import unittest
 
@@ -55,6 +56,46 @@ class TestPJFMutation(unittest.TestCase):
             PJFMutation(PJFConfiguration(Namespace(nologo=True, command="radamsa", stdin=True, level=6))).fuzz(None)
             raise Exception
 
+    def test_havoc_budget(self):
+        mutators = PJFMutation(PJFConfiguration(Namespace(nologo=True, level=6, havoc_stack=2))).mutators
+        actions = []
+        random_action = mutators.random_action
+        mutators.random_action = lambda buf: actions.append(random_action(buf))
+        for _ in range(32):
+            del actions[:]
+            mutators.fuzz("A" * 4096)
+            self.assertTrue(1 <= len(actions) <= 4)
+        self.assertEqual(mutators.fuzz(""), "")
+        self.assertEqual(mutators.fuzz("A"), "A")
+
+    def test_mutate_many(self):
+        mutation = PJFMutation(PJFConfiguration(Namespace(nologo=True, level=6)))
+        values = ["PIPPO", True, 1337, 1.0, None, u"\u00e8"] * 10
+        mutation.seed(1)
+        fuzzed = mutation.mutate_many(values)
+        mutation.seed(1)
+        self.assertEqual(fuzzed, [mutation.fuzz(value) for value in values])
+        mutation.seed(1)
+        decorated = []
+        for value in values:
+            decorated.append(mutation.decorators.mutate_object_decorate(lambda: value)())
+        self.assertEqual(fuzzed, decorated)
+
+    @unittest.skipUnless(pjf_mutators.numpy, "numpy is not installed")
+    def test_numbers_mutation(self):
+        mutators = PJFMutation(PJFConfiguration(Namespace(nologo=True, level=6))).mutators
+        for values in [list(range(-500, 500)), [x * 0.37 for x in range(-500, 500)]]:
+            mutators.seed(1)
+            fuzzed = mutators.fuzz_numbers(values)
+            self.assertEqual(len(fuzzed), len(values))
+            self.assertTrue(set(map(type, fuzzed)) <= set([int, float, str, bool]))
+            self.assertNotEqual(fuzzed, values)
+            mutators.seed(1)
+            self.assertEqual(fuzzed, mutators.fuzz_numbers(values))
+        self.assertEqual(mutators.fuzz_numbers([1] * 1000 + [True]), None)
+        self.assertEqual(mutators.fuzz_numbers([1.0] * 1000 + [float("inf")]), None)
+        self.assertEqual(mutators.fuzz_numbers([1] * 10), None)
+
 def test():
     print("=" * len(__TITLE__))
     print(__TITLE__)
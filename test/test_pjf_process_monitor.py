@@ -23,20 +23,35 @@ SOFTWARE.
 """
 from pyjfuzz.core.pjf_process_monitor import PJFProcessMonitor
 from pyjfuzz.core.pjf_configuration import PJFConfiguration
+from pyjfuzz.core.pjf_factory import PJFFactory
 from argparse import Namespace
 from test import TEST_PATH
 import subprocess
+import tempfile
 import unittest
+import shutil
+import struct
+import socket
 import os
 
 __TITLE__ = "Testing PJFProcessMonitor object"
 
 class TestPJFProcessMonitor(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        # the target is built outside of the source tree
+        cls.build_dir = tempfile.mkdtemp()
+        cls.sigsegv = os.path.join(cls.build_dir, "sigsegv")
+        subprocess.Popen(["gcc", os.path.join(TEST_PATH, "sigsegv.c"), "-o", cls.sigsegv], stderr=subprocess.PIPE,
+                         stdout=subprocess.PIPE).wait()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.build_dir)
+
     def test_process_monitor(self):
-        os.chdir(TEST_PATH)
-        subprocess.Popen(["gcc", "sigsegv.c", "-o", "sigsegv"], stderr=subprocess.PIPE, stdout=subprocess.PIPE).wait()
-        crash = PJFProcessMonitor(PJFConfiguration(Namespace(process_to_monitor=["%s/sigsegv" % TEST_PATH], debug=False,
+        crash = PJFProcessMonitor(PJFConfiguration(Namespace(process_to_monitor=[self.sigsegv], debug=False,
                                             ports={"servers":
                                                        {
                                                            "HTTP_PORT": 8080,
@@ -48,6 +63,25 @@ class TestPJFProcessMonitor(unittest.TestCase):
                                   ).run_and_monitor()
         self.assertTrue(crash)
 
+    def test_testcase_index(self):
+        config = PJFConfiguration(Namespace(process_to_monitor=self.sigsegv, debug=False, nologo=True,
+                                            json={"a": ["b", 1]}, level=6, seed=1337,
+                                            ports={"servers": {"TCASE_PORT": 0}}))
+        monitor = PJFProcessMonitor(config)
+        server, client = socket.socketpair()
+        client.sendall(struct.pack("<IQIQ", monitor.INDEX_FRAME, 1337, 3, 7))
+        monitor.handle(server)
+        client.close()
+        server, client = socket.socketpair()
+        client.sendall(struct.pack("<IQIQ", monitor.INDEX_FRAME, 0xffffffffffffffff, 3, 1 << 40))
+        monitor.handle(server)
+        client.close()
+        self.assertEqual(monitor.testcase, [(1337, 3, 7), (0xffffffffffffffff, 3, 1 << 40)])
+        del monitor.testcase[1:]
+        self.assertEqual(monitor.regenerate_testcase(*monitor.testcase[0]),
+                         PJFFactory(config).testcase(7, worker_id=3))
+        monitor._shutdown()
+
 def test():
     print("=" * len(__TITLE__))
     print(__TITLE__)
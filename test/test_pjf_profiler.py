@@ -0,0 +1,66 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from pyjfuzz.core.pjf_configuration import PJFConfiguration
+from pyjfuzz.core.pjf_profiler import PJFProfiler
+from pyjfuzz.core.pjf_factory import PJFFactory
+from argparse import Namespace
+import unittest
+import tempfile
+import json
+import os
+
+__TITLE__ = "Testing PJFProfiler object"
+
+class TestPJFProfiler(unittest.TestCase):
+
+    def test_spans(self):
+        config = PJFConfiguration(Namespace(json={"a": [1, {"b": "c"}]}, nologo=True, level=6, seed=1,
+                                            profile=True, profile_sample=2))
+        profiler = PJFProfiler(config).install()
+        self.assertTrue(PJFProfiler.active is profiler)
+        try:
+            factory = PJFFactory(config)
+            for _ in range(0, 10):
+                factory.fuzzed
+        finally:
+            profiler.uninstall()
+        self.assertEqual(PJFProfiler.active, None)
+        report = profiler.report()
+        # fuzz_elements is recursive, only the outermost call is measured
+        self.assertEqual(report["spans"]["PJFFactory.fuzz_elements"]["count"], 10)
+        self.assertEqual(report["spans"]["PJFEncoder.fragments"]["count"], 10)
+        self.assertEqual(report["spans"]["PJFMutation.fuzz"]["count"], 20)
+        self.assertTrue(len(report["cprofile"]) > 0)
+        path = os.path.join(tempfile.mkdtemp(), "profile.json")
+        profiler.dump(path)
+        with open(path) as dump:
+            self.assertEqual(json.loads(dump.read())["spans"].keys(), report["spans"].keys())
+        os.unlink(path)
+
+def test():
+    print("=" * len(__TITLE__))
+    print(__TITLE__)
+    print("=" * len(__TITLE__))
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPJFProfiler)
+    unittest.TextTestRunner(verbosity=2).run(suite)
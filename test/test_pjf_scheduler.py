@@ -0,0 +1,63 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from pyjfuzz.core.pjf_configuration import PJFConfiguration
+from pyjfuzz.core.pjf_scheduler import PJFScheduler
+from pyjfuzz.core.pjf_mutation import PJFMutation
+from argparse import Namespace
+import unittest
+import random
+
+__TITLE__ = "Testing PJFScheduler object"
+
+class TestPJFScheduler(unittest.TestCase):
+
+    def test_adaptive_selection(self):
+        scheduler = PJFScheduler()
+        rng = random.Random(1)
+        for _ in range(0, scheduler.PERIOD * 5):
+            action = scheduler.choice(rng, "havoc", [1, 2, 3])
+            scheduler.reward(edges=1 if action == 2 else 0)
+        stats = scheduler.stats
+        self.assertTrue(stats["havoc_2"]["weight"] > stats["havoc_1"]["weight"])
+        self.assertTrue(stats["havoc_2"]["selected"] > stats["havoc_3"]["selected"])
+        self.assertEqual(stats["havoc_1"]["edges"], 0)
+
+    def test_parser_errors(self):
+        scheduler = PJFScheduler()
+        self.assertTrue(scheduler.new_error(b"error at offset 10"))
+        self.assertFalse(scheduler.new_error(b"error at offset 12"))
+        self.assertTrue(scheduler.new_error("unexpected token"))
+        self.assertFalse(scheduler.new_error(""))
+
+    def test_mutation_stats(self):
+        mutation = PJFMutation(PJFConfiguration(Namespace(nologo=True, level=6, adaptive=True)))
+        mutation.fuzz("PIPPO")
+        self.assertTrue(sum(s["selected"] for s in mutation.mutators.scheduler.stats.values()) > 0)
+
+def test():
+    print("=" * len(__TITLE__))
+    print(__TITLE__)
+    print("=" * len(__TITLE__))
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPJFScheduler)
+    unittest.TextTestRunner(verbosity=2).run(suite)
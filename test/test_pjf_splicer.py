@@ -0,0 +1,78 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from pyjfuzz.core.pjf_configuration import PJFConfiguration
+from pyjfuzz.core.pjf_splicer import PJFSplicer
+from pyjfuzz.core.pjf_factory import PJFFactory
+from argparse import Namespace
+import unittest
+import random
+
+__TITLE__ = "Testing PJFSplicer object"
+
+class TestPJFSplicer(unittest.TestCase):
+
+    def test_splice(self):
+        splicer = PJFSplicer()
+        splicer.add({"user": {"name": "donor", "roles": [{"id": 1}]}})
+        seed = {"user": {"name": "seed"}, "other": [1, 2, 3]}
+        rng = random.Random(1)
+        results = [splicer.splice(seed, rng) for _ in range(0, 20)]
+        self.assertEqual(seed, {"user": {"name": "seed"}, "other": [1, 2, 3]})
+        self.assertTrue(any("donor" in str(result) for result in results))
+        # untouched subtrees are shared with the seed, only the spine is copied
+        self.assertTrue(any(result["other"] is seed["other"] for result in results))
+
+    def test_depth_budget(self):
+        splicer = PJFSplicer(PJFConfiguration(Namespace(nologo=True, splice_depth=2)))
+        splicer.add({"a": {"b": {"c": {"d": 1}}}})
+        rng = random.Random(1)
+        for _ in range(0, 20):
+            self.assertTrue(max(len(node[0]) for node in splicer.nodes(splicer.splice({"x": {"y": 1}}, rng))) <= 2)
+
+    def test_seed_index(self):
+        splicer = PJFSplicer()
+        splicer.add({"a": [{"b": 1}, 2], "c": {"d": {"e": None}}})
+        seed = {"a": {"x": [1, 2]}, "c": [{"d": 3}], "f": "g"}
+        index = splicer.load(seed)
+        sites = list(index[1])
+        rng = random.Random(1)
+        for _ in range(0, 20):
+            splicer.splice(seed, rng)
+        # the seed is walked once, grafts update a copy of its index
+        self.assertTrue(splicer.load(seed) is index)
+        self.assertEqual(index[1], sites)
+
+    def test_factory_splice(self):
+        config = PJFConfiguration(Namespace(json={"a": [{"b": "c"}], "d": 1}, nologo=True, level=6, seed=1,
+                                            splice=True))
+        first = PJFFactory(config)
+        second = PJFFactory(config)
+        self.assertEqual([first.fuzzed for _ in range(0, 10)], [second.fuzzed for _ in range(0, 10)])
+
+def test():
+    print("=" * len(__TITLE__))
+    print(__TITLE__)
+    print("=" * len(__TITLE__))
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPJFSplicer)
+    unittest.TextTestRunner(verbosity=2).run(suite)
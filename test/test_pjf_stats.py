@@ -0,0 +1,74 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2016 Daniele Linguaglossa <d.linguaglossa@mseclab.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from pyjfuzz.core.pjf_configuration import PJFConfiguration
+from pyjfuzz.core.pjf_factory import PJFFactory
+from pyjfuzz.core.pjf_stats import PJFStats
+from argparse import Namespace
+import multiprocessing
+import unittest
+
+__TITLE__ = "Testing PJFStats object"
+
+
+def run_worker(stats, slot):
+    stats.bind(slot)
+    for _ in range(0, 10):
+        stats.add("execs")
+    stats.crash(-11, "crash at 0x41414141")
+    stats.crash(-11, "crash at 0x42424242")
+    stats.crash(-1)
+
+
+class TestPJFStats(unittest.TestCase):
+
+    def test_shared_counters(self):
+        stats = PJFStats(workers=2)
+        workers = [multiprocessing.Process(target=run_worker, args=(stats, slot)) for slot in range(0, 2)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot["execs"], 20)
+        self.assertEqual(snapshot["crashes"], 4)
+        self.assertEqual(snapshot["hangs"], 2)
+        self.assertEqual(snapshot["buckets"], 2)
+        self.assertTrue("execs=20" in stats.status_line())
+
+    def test_factory_stages(self):
+        factory = PJFFactory(PJFConfiguration(Namespace(json={"a": [1, "b"]}, nologo=True, level=6, seed=1)))
+        factory.stats = PJFStats()
+        for _ in range(0, 5):
+            factory.fuzzed
+        snapshot = factory.stats.snapshot()
+        self.assertEqual(snapshot["testcases"], 5)
+        self.assertTrue(snapshot["stages"]["generate"]["total_ms"] > 0)
+        self.assertTrue(snapshot["stages"]["encode"]["total_ms"] > 0)
+
+def test():
+    print("=" * len(__TITLE__))
+    print(__TITLE__)
+    print("=" * len(__TITLE__))
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPJFStats)
+    unittest.TextTestRunner(verbosity=2).run(suite)